@@ -0,0 +1,114 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from settings import Structures
+
+
+class Adjacency:
+    """
+    The graph of a maze in compressed sparse row (CSR) form.
+
+    Cells are numbered row by row: the cell at (row, column) has id row * width + column. The neighbours of a cell
+    are indices[indptr[cell]:indptr[cell + 1]], in the order right, down, left, up (the direction order the solvers
+    have always used). Two cells are neighbours when the grid square between them is not a WALL.
+    """
+
+    # Number of cell rows compiled at a time, to bound the size of the temporary arrays
+    block_rows = 1024
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, width: int, height: int) -> None:
+        self.indptr = indptr
+        self.indices = indices
+        self.width = width
+        self.height = height
+        self._lists = None
+
+    @classmethod
+    def from_grid(cls, grid: np.ndarray) -> 'Adjacency':
+        """
+        Compile the adjacency of a maze grid in one vectorized pass.
+        :param grid: The maze grid, of shape (2 * height + 1, 2 * width + 1).
+        :return: The CSR adjacency of the maze.
+        """
+        height, width = (grid.shape[0] - 1) // 2, (grid.shape[1] - 1) // 2
+        east = grid[1::2, 2:-1:2] != Structures.WALL  # (height, width - 1)
+        south = grid[2:-1:2, 1::2] != Structures.WALL  # (height - 1, width)
+
+        degree = np.zeros((height, width), dtype=np.int32)
+        degree[:, :-1] += east
+        degree[:, 1:] += east
+        degree[:-1] += south
+        degree[1:] += south
+        indptr = np.zeros(width * height + 1, dtype=np.int32)
+        np.cumsum(degree, out=indptr[1:])
+        del degree
+
+        indices = np.empty(indptr[-1], dtype=np.int32)
+        for first_row in range(0, height, cls.block_rows):
+            last_row = min(first_row + cls.block_rows, height)
+            rows = last_row - first_row
+            offset = first_row * width
+
+            # The open directions of every cell in the block, in neighbour order
+            opened = np.zeros((rows, width, 4), dtype=bool)
+            down = south[first_row:last_row]
+            up = south[max(first_row - 1, 0):last_row - 1]
+            opened[:, :-1, 0] = east[first_row:last_row]
+            opened[:len(down), :, 1] = down
+            opened[:, 1:, 2] = east[first_row:last_row]
+            opened[rows - len(up):, :, 3] = up
+
+            cells = np.arange(offset, offset + rows * width, dtype=np.int32).reshape(rows, width, 1)
+            neighbours = cells + np.array([1, width, -1, -width], dtype=np.int32)
+            indices[indptr[offset]:indptr[offset + rows * width]] = neighbours[opened]
+        return cls(indptr, indices, width, height)
+
+    def neighbors(self, cell: int) -> np.ndarray:
+        """
+        Get the neighbours of a cell.
+        :param cell: The id of the cell.
+        :return: The ids of the cells connected to it.
+        """
+        return self.indices[self.indptr[cell]:self.indptr[cell + 1]]
+
+    def degree(self) -> np.ndarray:
+        """
+        :return: The number of neighbours of every cell.
+        """
+        return np.diff(self.indptr)
+
+    def lists(self) -> Tuple[List[int], List[int]]:
+        """
+        Get indptr and indices as Python lists, which are much faster to index from the pure Python solver loops.
+        The lists are built on first use and kept with the adjacency.
+        :return: The (indptr, indices) lists.
+        """
+        if self._lists is None:
+            self._lists = self.indptr.tolist(), self.indices.tolist()
+        return self._lists
+
+    def cell(self, position: Tuple[int, int]) -> int:
+        """
+        :param position: The (row, column) of a cell.
+        :return: The id of the cell.
+        """
+        return position[0] * self.width + position[1]
+
+    def grid_position(self, cell: int) -> Tuple[int, int]:
+        """
+        :param cell: The id of a cell.
+        :return: The position of the cell in the maze grid.
+        """
+        row, column = divmod(cell, self.width)
+        return 2 * row + 1, 2 * column + 1
+
+    def passage(self, first: int, second: int) -> Tuple[int, int]:
+        """
+        :param first: The id of a cell.
+        :param second: The id of a neighbouring cell.
+        :return: The position in the maze grid of the passage between the two cells.
+        """
+        first_row, first_column = divmod(first, self.width)
+        second_row, second_column = divmod(second, self.width)
+        return first_row + second_row + 1, first_column + second_column + 1
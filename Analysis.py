@@ -0,0 +1,332 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from Maze import Maze
+from settings import Structures, WallMask
+
+# Number of open sides of every 4 bit open sides mask
+_DEGREE = np.array([bin(mask).count('1') for mask in range(16)], dtype=np.int8)
+
+# The lowest and highest open side (0 north, 1 east, 2 south, 3 west) of every 4 bit open sides mask
+_FIRST_OPEN = np.array([(mask & -mask).bit_length() - 1 for mask in range(16)], dtype=np.int8)
+_LAST_OPEN = np.array([mask.bit_length() - 1 for mask in range(16)], dtype=np.int8)
+
+# The open sides masks of the corridor cells that run straight through (open on opposite sides)
+_STRAIGHT = np.array([mask in (WallMask.NORTH | WallMask.SOUTH, WallMask.EAST | WallMask.WEST)
+                      for mask in range(16)], dtype=bool)
+
+# Number of cells handled at a time, so the temporary arrays stay small
+CHUNK = 1 << 20
+
+# The side bits in direction order (0 north, 1 east, 2 south, 3 west)
+_SIDE_BITS = (WallMask.NORTH, WallMask.EAST, WallMask.SOUTH, WallMask.WEST)
+
+# Frontiers smaller than this are expanded in pure Python, as a vectorized level has a fixed cost of tens of
+# microseconds, which long winding corridors (one or two frontier cells for thousands of levels) would pay every level
+SMALL_FRONTIER = 64
+
+
+def open_sides(maze: Maze, first_row: int = 0, last_row: int = None) -> np.ndarray:
+    """
+    Find the open sides of the cells of a maze, as a mask of the WallMask side bits (NORTH, EAST, SOUTH and WEST).
+    This is the complement of the wall bits of Maze.to_wall_mask, but sides on the border of the maze always count as
+    closed and the mask can be computed for a block of rows at a time.
+    :param maze: The maze to look at.
+    :param first_row: The first row of cells to look at.
+    :param last_row: The row of cells after the last one to look at (the last row of the maze if not given).
+    :return: A (rows, width) uint8 array with the open side bits of every cell.
+    """
+    if last_row is None:
+        last_row = maze.height
+    rows = maze.grid[2 * first_row:2 * last_row + 1]
+    sides = (rows[0:-1:2, 1::2] != Structures.WALL).view(np.uint8) * np.uint8(WallMask.NORTH)
+    sides |= (rows[1::2, 2::2] != Structures.WALL).view(np.uint8) * np.uint8(WallMask.EAST)
+    sides |= (rows[2::2, 1::2] != Structures.WALL).view(np.uint8) * np.uint8(WallMask.SOUTH)
+    sides |= (rows[1::2, 0:-1:2] != Structures.WALL).view(np.uint8) * np.uint8(WallMask.WEST)
+    if first_row == 0:
+        sides[0] &= ~np.uint8(WallMask.NORTH)
+    if last_row == maze.height:
+        sides[-1] &= ~np.uint8(WallMask.SOUTH)
+    sides[:, -1] &= ~np.uint8(WallMask.EAST)
+    sides[:, 0] &= ~np.uint8(WallMask.WEST)
+    return sides
+
+
+def _row_blocks(maze: Maze):
+    """
+    Split the rows of cells of a maze in blocks of about CHUNK cells.
+    :return: A generator of (first row, last row) tuples.
+    """
+    rows_per_block = max(1, CHUNK // maze.width)
+    for first_row in range(0, maze.height, rows_per_block):
+        yield first_row, min(first_row + rows_per_block, maze.height)
+
+
+def dead_end_mask(maze: Maze) -> np.ndarray:
+    """
+    Find all dead ends of a maze at once (the vectorized form of Maze.is_dead_end for every cell).
+    :param maze: The maze to look at.
+    :return: A (height, width) boolean array, True for the cells with exactly one open side.
+    """
+    mask = np.empty((maze.height, maze.width), dtype=bool)
+    for first_row, last_row in _row_blocks(maze):
+        mask[first_row:last_row] = _DEGREE[open_sides(maze, first_row, last_row)] == 1
+    return mask
+
+
+def passage_count(maze: Maze) -> int:
+    """
+    Count the open passages between neighbouring cells of a maze, a block of rows at a time.
+    A maze is perfect (a spanning tree of its cells) when it is connected and has one passage less than cells.
+    :param maze: The maze to look at.
+    :return: The number of passages.
+    """
+    sides = sum(int(_DEGREE[open_sides(maze, first_row, last_row)].sum()) for first_row, last_row in _row_blocks(maze))
+    return sides // 2
+
+
+def corridor_length_histogram(maze: Maze, sides: np.ndarray = None) -> np.ndarray:
+    """
+    Measure every corridor of a maze. A corridor is a maximal chain of cells with exactly two open sides, its length
+    is the number of cells in the chain (so a direct passage between two junctions is not a corridor).
+
+    Every corridor cell gets two states, one for each direction along the corridor, and every state points to the
+    next state in its direction. The distance of every state to the end of its corridor is then found by pointer
+    jumping (Wyllie's list ranking): every round doubles how far the pointers reach, so even a corridor through the
+    whole maze takes only about log2(cells) vectorized rounds. The states are updated in chunks to bound the memory
+    use, which is fine as a state always takes over the pointer and distance of another state together.
+    :param maze: The maze to look at.
+    :param sides: The open sides of every cell, as returned by open_sides for the whole maze (computed if not given).
+    :return: The number of corridors of every length (index 0 is always 0).
+    """
+    width, height = maze.width, maze.height
+    if sides is None:
+        sides = open_sides(maze)
+
+    # Corridor cells are numbered in row-major order, row_offsets holds the number of the first one of every row
+    row_offsets = np.zeros(height + 1, dtype=np.int64)
+    for first_row, last_row in _row_blocks(maze):
+        row_offsets[first_row + 1:last_row + 1] = np.count_nonzero(_DEGREE[sides[first_row:last_row]] == 2, axis=1)
+    np.cumsum(row_offsets, out=row_offsets)
+    size = int(row_offsets[-1])
+
+    # State 2 * i + j walks from corridor cell i through its first (j = 0) or last (j = 1) open side, and continues
+    # through the far side of the next cell. The states at the end of a corridor point to themselves at distance 0.
+    successor = np.empty(2 * size, dtype=np.int32)
+    distance = np.empty(2 * size, dtype=np.int32)
+    offsets = np.array([-width, 1, width, -1], dtype=np.int64)  # North, east, south, west
+    for first_row, last_row in _row_blocks(maze):
+        # The block with a row of its neighbours on both sides, so every neighbour of a corridor cell is included
+        top, bottom = max(first_row - 1, 0), min(last_row + 1, height)
+        window = sides[top:bottom].reshape(-1)
+        corridor = _DEGREE[window] == 2
+        numbers = np.cumsum(corridor, dtype=np.int64)
+        numbers += row_offsets[top] - 1
+
+        cells = np.flatnonzero(corridor[(first_row - top) * width:(last_row - top) * width])
+        cells += (first_row - top) * width
+        first_state, last_state = 2 * row_offsets[first_row], 2 * row_offsets[last_row]
+        for side, open_side in enumerate((_FIRST_OPEN, _LAST_OPEN)):
+            direction = open_side[window[cells]]
+            neighbours = cells + offsets[direction]
+            continues = corridor[neighbours]
+            # Leave the next cell through its last side if its first side is the one we came in through
+            far_side = _FIRST_OPEN[window[neighbours]] == (direction + 2) % 4
+            states = slice(first_state + side, last_state, 2)
+            successor[states] = np.arange(first_state + side, last_state, 2, dtype=np.int32)
+            successor[states][continues] = 2 * numbers[neighbours[continues]] + far_side[continues]
+            distance[states] = continues
+
+    def still_active(states):
+        return states[distance[successor[states]] != 0]
+
+    active = [still_active(np.arange(start, min(start + CHUNK, 2 * size), dtype=np.int32))
+              for start in range(0, 2 * size, CHUNK)]
+    for _ in range(size.bit_length() + 1):
+        active = [states for states in active if len(states)]
+        if not active:
+            break
+        for position, states in enumerate(active):
+            following = successor[states]
+            distance[states] += distance[following]
+            successor[states] = successor[following]
+            active[position] = still_active(states)
+
+    # Every chain is counted at both of its ends: the state leaving an end through the corridor holds its length
+    histogram = np.zeros(2, dtype=np.int64)
+    for start in range(0, size, CHUNK):
+        pairs = distance[2 * start:2 * min(start + CHUNK, size)].reshape(-1, 2)
+        for side in range(2):
+            counts = np.bincount(pairs[pairs[:, 1 - side] == 0, side] + 1)
+            if len(counts) > len(histogram):
+                histogram = np.concatenate((histogram, np.zeros(len(counts) - len(histogram), dtype=np.int64)))
+            histogram[:len(counts)] += counts
+    histogram //= 2
+
+    # What is left are corridors that loop back onto themselves without any junction, walk those one by one
+    active = [states for states in active if len(states)]
+    if active:
+        corridor_cells = np.flatnonzero(_DEGREE[sides] == 2)
+        looping = set(corridor_cells[np.concatenate(active) // 2].tolist())
+        flat_sides = sides.reshape(-1)
+        while looping:
+            start = cell = looping.pop()
+            came_from, length = -1, 1
+            while True:
+                direction = int(_FIRST_OPEN[flat_sides[cell]])
+                if cell + offsets[direction] == came_from:
+                    direction = int(_LAST_OPEN[flat_sides[cell]])
+                came_from, cell = cell, cell + int(offsets[direction])
+                if cell == start:
+                    break
+                looping.discard(cell)
+                length += 1
+            if length >= len(histogram):
+                histogram = np.concatenate((histogram, np.zeros(length + 1 - len(histogram), dtype=np.int64)))
+            histogram[length] += 1
+    return np.trim_zeros(histogram, 'b')
+
+
+def distance_field(maze: Maze, sources) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the distance from the nearest of one or more source cells to every cell of a maze, with a level-synchronous
+    breadth-first search. Every level expands the whole frontier at once: for each direction, the frontier cells that
+    are open on that side (a boolean mask lookup in the precomputed open sides) step to their neighbours, and the
+    neighbours that were not reached before form the next frontier.
+
+    Every reached cell also gets the direction to its parent, the neighbour one step closer to a source. When several
+    neighbours are, the first one in direction order is the parent, so the result does not depend on the order of the
+    sources. A path from any cell back to a source is then a cheap backtrace (see trace_path).
+    :param maze: The maze to search.
+    :param sources: The (row, column) of a source cell, or a sequence of them.
+    :return: A (height, width) int32 array with the number of steps from the nearest source to every cell (-1 for
+    cells that can not be reached) and a (height, width) int8 array with the direction to the parent of every cell
+    (0 north, 1 east, 2 south, 3 west, -1 for the sources and cells that can not be reached).
+    """
+    width, height = maze.width, maze.height
+    sources = np.asarray(sources, dtype=np.int64).reshape(-1, 2)
+    if ((sources < 0) | (sources >= (height, width))).any():
+        raise ValueError(f"Source cells outside of the {width}x{height} maze")
+
+    sides = open_sides(maze).reshape(-1)
+    opened = [(sides & np.uint8(bit)) != 0 for bit in _SIDE_BITS]
+    offsets = (-width, 1, width, -1)
+
+    distance = np.full(width * height, -1, dtype=np.int32)
+    parent = np.full(width * height, -1, dtype=np.int8)
+    reached = np.zeros(width * height, dtype=bool)
+    frontier = np.unique(sources[:, 0] * width + sources[:, 1])
+    reached[frontier] = True
+    distance[frontier] = 0
+
+    # Cells reached from small frontiers, with their level and parent direction, written to the arrays at the end
+    sides_view, reached_view = memoryview(sides), memoryview(reached)
+    cells, levels, parents = [], [], []
+    level = 0
+    while len(frontier):
+        level += 1
+        following = []
+        if len(frontier) < SMALL_FRONTIER:
+            if isinstance(frontier, np.ndarray):
+                frontier = frontier.tolist()
+            for direction in range(4):
+                # The children of the frontier cells lie on the opposite side of their parent direction
+                side = (direction + 2) % 4
+                bit, offset = _SIDE_BITS[side], offsets[side]
+                for cell in frontier:
+                    if sides_view[cell] & bit:
+                        child = cell + offset
+                        if not reached_view[child]:
+                            reached_view[child] = True
+                            following.append(child)
+                            parents.append(direction)
+            cells += following
+            levels += [level] * len(following)
+            frontier = following
+        else:
+            frontier = np.asarray(frontier, dtype=np.int64)
+            for direction in range(4):
+                side = (direction + 2) % 4
+                children = frontier[opened[side][frontier]] + offsets[side]
+                children = children[~reached[children]]
+                reached[children] = True
+                distance[children] = level
+                parent[children] = direction
+                following.append(children)
+            frontier = np.concatenate(following)
+    distance[cells] = levels
+    parent[cells] = parents
+    return distance.reshape(height, width), parent.reshape(height, width)
+
+
+def trace_path(distance: np.ndarray, parent: np.ndarray, target: Tuple[int, int]) -> List[Tuple[int, int]]:
+    """
+    Follow the parent directions of a distance field from a cell back to its nearest source, in distance[target] steps.
+    :param distance: The distances, as returned by distance_field.
+    :param parent: The parent directions, as returned by distance_field.
+    :param target: The (row, column) of the cell to trace back from.
+    :return: The path from the source to the target as grid positions (the form the solvers return), or an empty list
+    if the target can not be reached.
+    """
+    row, column = target
+    if distance[row, column] < 0:
+        return []
+    steps = ((-1, 0), (0, 1), (1, 0), (0, -1))
+    path = [(2 * row + 1, 2 * column + 1)]
+    direction = int(parent[row, column])
+    while direction >= 0:
+        d_row, d_column = steps[direction]
+        row, column = row + d_row, column + d_column
+        path.append((2 * row + 1, 2 * column + 1))
+        direction = int(parent[row, column])
+    path.reverse()
+    return path
+
+
+class MazeStatistics:
+    """
+    The texture of a maze: how many dead ends, junctions and corridors it has, how straight its corridors run and how
+    long they are. Everything is computed with vectorized NumPy over the grid, a block of rows at a time, so it scales
+    to very large mazes.
+
+    Cells are classified by their number of open sides: 1 is a dead end, 2 a corridor cell and 3 or 4 a junction.
+    A corridor cell either runs straight (open on opposite sides) or turns. The straightness, also called the river
+    factor, is the fraction of corridor cells that run straight.
+    """
+
+    def __init__(self, maze: Maze) -> None:
+        self.cells = maze.width * maze.height
+        self.dead_end_mask = np.empty((maze.height, maze.width), dtype=bool)
+        self.dead_ends = self.junctions = self.corridor_cells = self.straight = 0
+        sides = np.empty((maze.height, maze.width), dtype=np.uint8)
+        for first_row, last_row in _row_blocks(maze):
+            block = sides[first_row:last_row]
+            block[...] = open_sides(maze, first_row, last_row)
+            degree = _DEGREE[block]
+            self.dead_end_mask[first_row:last_row] = degree == 1
+            self.dead_ends += int(np.count_nonzero(degree == 1))
+            self.junctions += int(np.count_nonzero(degree >= 3))
+            self.corridor_cells += int(np.count_nonzero(degree == 2))
+            self.straight += int(np.count_nonzero(_STRAIGHT[block]))
+        self.turns = self.corridor_cells - self.straight
+        self.straightness = self.straight / self.corridor_cells if self.corridor_cells else 0.0
+
+        self.corridor_length_histogram = corridor_length_histogram(maze, sides)
+        self.corridors = int(self.corridor_length_histogram.sum())
+
+    def summary(self) -> dict:
+        """
+        :return: The statistics as a dictionary, with the histogram left out.
+        """
+        return {
+            'cells': self.cells,
+            'dead_ends': self.dead_ends,
+            'junctions': self.junctions,
+            'corridor_cells': self.corridor_cells,
+            'corridors': self.corridors,
+            'straight': self.straight,
+            'turns': self.turns,
+            'straightness': self.straightness,
+            'mean_corridor_length': self.corridor_cells / self.corridors if self.corridors else 0.0,
+        }
@@ -0,0 +1,176 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+import tempfile
+
+from Maze import Maze, MazeGenerator
+from settings import MazeEncoding
+
+# The extension of the cached maze files, which are in the binary maze format (see Maze.dump)
+CACHE_FILE_EXTENSION = '.maze'
+
+
+@functools.lru_cache(maxsize=None)
+def code_version(generator_class: type) -> str:
+    """
+    Hash the source code a generator class depends on: the modules of the classes it inherits from and the modules of
+    this repository its own module imports from (FrontierBag, DisjointSet, ...). settings.py is left out, as it is
+    configuration and the values a generation depends on are part of the cache key.
+    :param generator_class: The MazeGenerator subclass.
+    :return: The SHA-256 hex digest of the source files.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    modules = {sys.modules[cls.__module__] for cls in generator_class.__mro__ if cls is not object}
+    for module in list(modules):
+        modules.update(filter(None, map(inspect.getmodule, vars(module).values())))
+    files = sorted(
+        os.path.abspath(module.__file__) for module in modules
+        if module.__name__ != 'settings' and getattr(module, '__file__', None)
+        and os.path.abspath(module.__file__).startswith(root + os.sep)
+    )
+    digest = hashlib.sha256()
+    for filename in files:
+        with open(filename, 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def generator_parameters(generator: MazeGenerator) -> dict:
+    """
+    Get the constructor parameters of a generator, which every generator keeps in attributes of the same name.
+    :param generator: The generator.
+    :return: The parameters by name, without the maze and the random state.
+    """
+    parameters = inspect.signature(type(generator).__init__).parameters
+    return {
+        name: getattr(generator, name, parameter.default) for name, parameter in parameters.items()
+        if name not in ('self', 'maze', 'seed', 'rng')
+    }
+
+
+class MazeCache:
+    """
+    A content-addressed on-disk cache of generated mazes.
+
+    A maze is stored under the hash of everything that determines it: the generator class, the size of the maze, the
+    seed, the generator and generate parameters and the version of the generator code (see code_version). Mazes are
+    stored with Maze.dump in the lossless WALL_MASK encoding, one byte per cell. Every hit touches the modification
+    time of its file, so when the files take more than max_bytes the least recently used ones are evicted first.
+
+    Files are written under a temporary name and renamed into place, so several processes can share a cache.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        """
+        :param directory: The directory to store the mazes in, created if needed.
+        :param max_bytes: The size cap of the cache.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, generator: MazeGenerator, **kwargs) -> str:
+        """
+        :param generator: The generator, set up with its maze and seed.
+        :param kwargs: The keyword arguments for generator.generate.
+        :return: The cache key of the maze the generator would generate.
+        """
+        arguments = inspect.signature(generator.generate).bind(**kwargs)
+        arguments.apply_defaults()
+        description = [
+            f"{type(generator).__module__}.{type(generator).__qualname__}",
+            generator.maze.width,
+            generator.maze.height,
+            generator.seed,
+            generator_parameters(generator),
+            dict(arguments.arguments),
+            code_version(type(generator)),
+        ]
+        return hashlib.sha256(json.dumps(description, sort_keys=True, default=repr).encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> str:
+        """
+        :param key: A cache key.
+        :return: The name of the file the maze with the given key is stored in.
+        """
+        return os.path.join(self.directory, key + CACHE_FILE_EXTENSION)
+
+    def generate(self, generator: MazeGenerator, **kwargs) -> bool:
+        """
+        Generate the maze of a generator, or copy it from the cache into generator.maze if it was generated before.
+        A cache hit does not touch the rest of the state of the generator. Generators without a seed (set up with an
+        rng only) can not be reproduced, so they always generate.
+        :param generator: The generator, set up with its maze and seed.
+        :param kwargs: The keyword arguments for generator.generate.
+        :return: True on a cache hit.
+        """
+        if generator.seed is None:
+            generator.generate(**kwargs)
+            return False
+
+        maze = generator.maze
+        path = self.path(self.key(generator, **kwargs))
+        try:
+            cached = Maze.load(path)
+        except (OSError, ValueError):  # Not cached, or a corrupt file that is simply overwritten
+            cached = None
+        if cached is not None and (cached.width, cached.height) == (maze.width, maze.height):
+            maze.grid[...] = cached.grid
+            maze.invalidate_adjacency()
+            os.utime(path)  # Mark the maze as recently used
+            self.hits += 1
+            return True
+
+        generator.generate(**kwargs)
+        self.store(path, maze)
+        self.misses += 1
+        return False
+
+    def store(self, path: str, maze: Maze) -> None:
+        """
+        Write a maze to the cache and evict the least recently used mazes if the cache is over its size cap.
+        :param path: The name of the cache file of the maze.
+        :param maze: The maze to store.
+        """
+        handle, temporary = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        os.close(handle)
+        try:
+            maze.dump(temporary, encoding=MazeEncoding.WALL_MASK)
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used mazes until the cache is within its size cap.
+        """
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(CACHE_FILE_EXTENSION):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # Already evicted by another process
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Remove all mazes from the cache.
+        """
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(CACHE_FILE_EXTENSION):
+                    os.remove(entry.path)
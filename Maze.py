@@ -1,23 +1,290 @@
+import os
+import random
+import struct
+import zlib
+from collections import deque
+from typing import TYPE_CHECKING, Iterator, Tuple
+
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.animation import ArtistAnimation
 
-from settings import Structures
+import Raster
+from Adjacency import Adjacency
+from Video import VideoWriter
+from settings import Structures, WallMask, MazeEncoding, pixels_per_cell
+
+# matplotlib is only imported by the methods that show or animate a maze: importing it takes about half a second and
+# tens of megabytes, which batch generation and solving should not pay for.
+if TYPE_CHECKING:
+    from matplotlib.animation import FuncAnimation
+
+# Header of the binary maze file format: magic, format version, encoding, width, height, seed (-1 if unknown), the
+# length of the generator name and the CRC-32 of the payload. The 64 byte header is followed by the generator name
+# (UTF-8), NUL padded to a multiple of 64 bytes, so a RAW payload can be memmapped at an aligned offset.
+MAZE_FILE_MAGIC = b'MAZE'
+MAZE_FILE_VERSION = 2
+MAZE_FILE_HEADER = struct.Struct('<4sBB2xIIqII32x')
+# The fields all versions share, and the rest of the header of version 1, which held the generator name cut to 32 bytes
+_MAZE_FILE_PREFIX = struct.Struct('<4sBB2xIIq')
+_MAZE_FILE_REST_V1 = struct.Struct('<32sI4x')
+
+
+def random_state(seed: int = None, rng: np.random.Generator = None):
+    """
+    Set up the random number generators of a generator or solver run.
+
+    The NumPy Generator is used for bulk draws. Single draws from pure Python loops use a random.Random seeded from
+    it instead, as every call into NumPy costs about a microsecond. Both streams only depend on the seed, so a run can
+    be reproduced from it.
+    :param seed: The seed of the run (a fresh 63 bit seed is drawn from the OS entropy if neither it nor rng is given).
+    :param rng: A NumPy Generator to draw from instead of seeding a new one, e.g. one of the independent streams made
+    for parallel workers with np.random.default_rng(seed).spawn(n).
+    :return: The (seed, NumPy Generator, random.Random) tuple, the seed is None if only rng was given.
+    """
+    if rng is None:
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1, np.uint64)[0] >> np.uint64(1))
+        rng = np.random.default_rng(seed)
+    return seed, rng, random.Random(int(rng.integers(1 << 63)))
+
+
+def _payload_offset(generator_length: int) -> int:
+    """
+    :param generator_length: The length in bytes of the encoded generator name.
+    :return: The offset of the payload in a maze file, after the header and the padded generator name.
+    """
+    return MAZE_FILE_HEADER.size + -(-generator_length // MAZE_FILE_HEADER.size) * MAZE_FILE_HEADER.size
+
+
+def _payload_size(encoding: int, width: int, height: int) -> int:
+    """
+    :param encoding: The payload encoding, a MazeEncoding value.
+    :param width: The width of the maze.
+    :param height: The height of the maze.
+    :return: The size in bytes of the payload of a maze file.
+    """
+    if encoding == MazeEncoding.RAW:
+        return (2 * height + 1) * (2 * width + 1)
+    if encoding == MazeEncoding.PACKED_WALLS:
+        return (2 * width * height + 7) // 8
+    if encoding == MazeEncoding.WALL_MASK:
+        return width * height
+    raise ValueError(f"Unknown maze encoding: {encoding}")
 
 
 class Maze:
     """
     The Maze class is a class to hold the maze we generated.
+
+    The grid is normally held in memory, but it can also be backed by a file with np.memmap, so mazes larger than
+    memory can be built by generators that only touch local neighbourhoods (binary tree, sidewinder, Eller's).
+    Whole-grid operations on the maze work in blocks of rows, so a memmapped grid is never loaded as a whole.
     """
 
-    def __init__(self, width: int, height: int) -> None:
+    # Number of grid rows handled at a time by the block-wise operations (must be even)
+    block_rows = 1024
+
+    # The cached adjacency graph of the maze and the checksum of the walls it was compiled from, if known (see adjacency)
+    _adjacency = None
+    _adjacency_key = None
+
+    def __init__(self, width: int, height: int, filename: str = None, mode: str = 'w+', offset: int = 0) -> None:
+        """
+        :param width: The width of the maze in cells.
+        :param height: The height of the maze in cells.
+        :param filename: If given, back the grid by this file instead of memory.
+        :param mode: The np.memmap mode: 'w+' creates a fresh maze, 'r+' and 'r' open the maze stored in the file.
+        :param offset: The byte offset of the grid in the file.
+        """
         self.width = width
         self.height = height
-        # Create a grid with walls (2) and cells (0)
-        self.grid = np.zeros((2 * height + 1, 2 * width + 1), dtype=np.int8)
-        self.grid[1::2, 1::2] = Structures.EMPTY  # Paths
-        self.grid[0::2, :] = Structures.WALL  # Horizontal walls
-        self.grid[:, 0::2] = Structures.WALL  # Vertical walls
+        # The generator that built the maze and its seed, recorded in the binary file format
+        self.generator = None
+        self.seed = None
+        shape = (2 * height + 1, 2 * width + 1)
+        if filename is None:
+            self.grid = np.zeros(shape, dtype=np.int8)
+        else:
+            self.grid = np.memmap(filename, dtype=np.int8, mode=mode, shape=shape, offset=offset)
+            if mode != 'w+':
+                return
+        # Create a grid with walls (4) and cells (0)
+        self.reset()
+
+    @classmethod
+    def open(cls, filename: str, width: int, height: int, mode: str = 'r+') -> 'Maze':
+        """
+        Open a maze whose grid was stored in a file by a memmapped maze.
+        :param filename: The file holding the grid.
+        :param width: The width of the maze in cells.
+        :param height: The height of the maze in cells.
+        :param mode: The np.memmap mode, 'r+' to allow changes and 'r' for read only access.
+        :return: The memmapped maze.
+        """
+        return cls(width, height, filename=filename, mode=mode)
+
+    @property
+    def is_memmapped(self) -> bool:
+        return isinstance(self.grid, np.memmap)
+
+    def flush(self) -> None:
+        """
+        Write the changes of a memmapped grid to its file (no-op for in-memory mazes).
+        """
+        if self.is_memmapped and self.grid.mode != 'r':
+            self.grid.flush()
+
+    def dump(self, filename: str, encoding: int = MazeEncoding.RAW) -> None:
+        """
+        Write the maze to a file in the binary maze format: a 64 byte header, the generator name and the encoded grid.
+        :param filename: The name of the file to write.
+        :param encoding: The payload encoding, a MazeEncoding value. PACKED_WALLS drops SELECTED markings, WALL_MASK
+        keeps them in a quarter of the size of RAW.
+        """
+        generator = (self.generator or '').encode('utf-8')
+        seed = -1 if self.seed is None else self.seed
+        with open(filename, 'wb') as file:
+            file.seek(MAZE_FILE_HEADER.size)
+            file.write(generator.ljust(_payload_offset(len(generator)) - MAZE_FILE_HEADER.size, b'\0'))
+            if encoding == MazeEncoding.RAW:
+                checksum = 0
+                for _, rows in self.row_blocks():
+                    data = np.ascontiguousarray(rows).data
+                    checksum = zlib.crc32(data, checksum)
+                    file.write(data)
+            elif encoding == MazeEncoding.PACKED_WALLS:
+                data = self.to_packed_walls().data
+                checksum = zlib.crc32(data)
+                file.write(data)
+            elif encoding == MazeEncoding.WALL_MASK:
+                data = self.to_wall_mask().data
+                checksum = zlib.crc32(data)
+                file.write(data)
+            else:
+                raise ValueError(f"Unknown maze encoding: {encoding}")
+            file.seek(0)
+            file.write(MAZE_FILE_HEADER.pack(
+                MAZE_FILE_MAGIC, MAZE_FILE_VERSION, encoding, self.width, self.height, seed, len(generator), checksum
+            ))
+
+    @classmethod
+    def load(cls, filename: str, mmap: bool = False, mode: str = 'r+', verify: bool = True) -> 'Maze':
+        """
+        Load a maze written by dump. The payload is used as is (np.frombuffer or np.memmap), without per-cell parsing.
+        :param filename: The name of the file to read.
+        :param mmap: Should a RAW grid be memmapped instead of read into memory?
+        :param mode: The np.memmap mode when mmap is set.
+        :param verify: Should the payload checksum be checked? This reads the whole file, also when memmapped.
+        :return: The loaded maze, with its generator and seed set from the header.
+        """
+        with open(filename, 'rb') as file:
+            header = file.read(MAZE_FILE_HEADER.size)
+            if len(header) != MAZE_FILE_HEADER.size:
+                raise ValueError(f"{filename} is too short to be a maze file")
+            magic, version, encoding, width, height, seed = _MAZE_FILE_PREFIX.unpack_from(header)
+            if magic != MAZE_FILE_MAGIC:
+                raise ValueError(f"{filename} is not a maze file")
+            if version == MAZE_FILE_VERSION:
+                generator_length, checksum = MAZE_FILE_HEADER.unpack(header)[-2:]
+                generator = file.read(generator_length)
+                offset = _payload_offset(generator_length)
+                file.seek(offset)
+            elif version == 1:
+                generator, checksum = _MAZE_FILE_REST_V1.unpack_from(header, _MAZE_FILE_PREFIX.size)
+                # The name was cut to 32 bytes, possibly inside a character
+                generator = generator.rstrip(b'\0').decode('utf-8', errors='ignore').encode('utf-8')
+                offset = MAZE_FILE_HEADER.size
+            else:
+                raise ValueError(f"Unsupported maze file version: {version}")
+
+            # Check the size of the payload before it is shaped into a maze, so a cut off file is reported as such
+            expected_size = _payload_size(encoding, width, height)
+            payload_size = os.fstat(file.fileno()).st_size - offset
+            if payload_size != expected_size:
+                raise ValueError(
+                    f"{filename} has {payload_size} payload bytes instead of {expected_size} for a {width}x{height} "
+                    f"maze, the file is corrupt"
+                )
+
+            if encoding == MazeEncoding.RAW and mmap:
+                maze = cls(width, height, filename=filename, mode=mode, offset=offset)
+                payload_checksum = 0
+                if verify:
+                    for _, rows in maze.row_blocks():
+                        payload_checksum = zlib.crc32(rows.data, payload_checksum)
+            else:
+                payload = bytearray(payload_size)
+                file.readinto(payload)
+                payload_checksum = zlib.crc32(payload) if verify else 0
+                if verify and payload_checksum != checksum:
+                    raise ValueError(f"Checksum mismatch in {filename}, the file is corrupt")
+                if encoding == MazeEncoding.RAW:
+                    maze = cls.__new__(cls)
+                    maze.width, maze.height = width, height
+                    maze.grid = np.frombuffer(payload, dtype=np.int8).reshape(2 * height + 1, 2 * width + 1)
+                elif encoding == MazeEncoding.PACKED_WALLS:
+                    maze = cls.from_packed_walls(np.frombuffer(payload, dtype=np.uint8), width, height)
+                else:
+                    maze = cls.from_wall_mask(np.frombuffer(payload, dtype=np.uint8).reshape(height, width))
+
+        if verify and payload_checksum != checksum:
+            raise ValueError(f"Checksum mismatch in {filename}, the file is corrupt")
+        maze.generator = generator.decode('utf-8') or None
+        maze.seed = None if seed == -1 else seed
+        return maze
+
+    def adjacency(self, verify: bool = False) -> Adjacency:
+        """
+        Get the CSR adjacency graph of the maze, compiled on first use and cached on the maze.
+        Everything that writes walls (reset, replace, MazeGenerator.carve and the generators that write the grid
+        directly) drops the cache with invalidate_adjacency, so a cache hit costs nothing. Marking cells SELECTED keeps
+        it valid.
+        :param verify: Also check the cache against a checksum of the walls, for grids that were changed without
+        invalidate_adjacency (such as a memmapped grid written by another process). This reads the whole grid.
+        :return: The adjacency graph of the maze.
+        """
+        key = None
+        if verify:
+            key = self._walls_checksum()
+            if key != self._adjacency_key:
+                self._adjacency = None
+        if self._adjacency is None:
+            self._adjacency = Adjacency.from_grid(self.grid)
+            self._adjacency_key = key
+        return self._adjacency
+
+    def invalidate_adjacency(self) -> None:
+        """
+        Drop the cached adjacency graph after the walls changed, it is compiled again on the next use.
+        """
+        self._adjacency = None
+        self._adjacency_key = None
+
+    def _walls_checksum(self) -> int:
+        """
+        :return: The CRC-32 of the positions of all walls in the grid.
+        """
+        checksum = 0
+        for _, rows in self.row_blocks():
+            checksum = zlib.crc32(np.packbits(rows == Structures.WALL), checksum)
+        return checksum
+
+    def row_blocks(self):
+        """
+        Iterate over the grid in blocks of block_rows rows, every block starting on a wall row.
+        :return: A generator of (first row, view of the rows) tuples.
+        """
+        for first_row in range(0, self.grid.shape[0], self.block_rows):
+            yield first_row, self.grid[first_row:first_row + self.block_rows]
+
+    def replace(self, old: int, new: int) -> None:
+        """
+        Replace every occurrence of one structure in the grid by another, one block of rows at a time.
+        :param old: The structure to replace.
+        :param new: The structure to replace it with.
+        """
+        self.invalidate_adjacency()
+        for _, rows in self.row_blocks():
+            rows[rows == old] = new
 
     def is_dead_end(self, x, y):
         neighbours = 0
@@ -42,124 +309,307 @@ class Maze:
         else:
             return False
 
+    def to_wall_mask(self) -> np.ndarray:
+        """
+        Encode the maze as one uint8 per cell, using the bits in WallMask.
+
+        Every cell stores its four walls and whether it, and the open passages to its east and south, are SELECTED.
+        This is lossless for grids that only contain Structures values and have walls on all grid corners (as every
+        generator produces), and takes a quarter of the memory of the grid.
+        :return: An array of shape (height, width) with the wall bits of every cell.
+        """
+        grid = self.grid
+        mask = (grid[0:-1:2, 1::2] == Structures.WALL).view(np.uint8) * np.uint8(WallMask.NORTH)
+        mask |= (grid[1::2, 2::2] == Structures.WALL).view(np.uint8) * np.uint8(WallMask.EAST)
+        mask |= (grid[2::2, 1::2] == Structures.WALL).view(np.uint8) * np.uint8(WallMask.SOUTH)
+        mask |= (grid[1::2, 0:-1:2] == Structures.WALL).view(np.uint8) * np.uint8(WallMask.WEST)
+        mask |= (grid[1::2, 1::2] == Structures.SELECTED).view(np.uint8) * np.uint8(WallMask.CELL_SELECTED)
+        mask |= (grid[1::2, 2::2] == Structures.SELECTED).view(np.uint8) * np.uint8(WallMask.EAST_SELECTED)
+        mask |= (grid[2::2, 1::2] == Structures.SELECTED).view(np.uint8) * np.uint8(WallMask.SOUTH_SELECTED)
+        return mask
+
+    @classmethod
+    def from_wall_mask(cls, mask: np.ndarray) -> 'Maze':
+        """
+        Create a maze from the one uint8 per cell representation made by to_wall_mask.
+        Interior walls are taken from the east and south bits, the north and west bits are only used on the border.
+        :param mask: An array of shape (height, width) with the wall bits of every cell.
+        :return: The decoded maze.
+        """
+        height, width = mask.shape
+        maze = cls(width, height)
+        grid = maze.grid
+
+        def passage(wall_bit, selected_bit):
+            return np.where(
+                mask & wall_bit,
+                np.int8(Structures.WALL),
+                np.where(mask & selected_bit, np.int8(Structures.SELECTED), np.int8(Structures.EMPTY))
+            )
+
+        grid[1::2, 1::2] = np.where(
+            mask & WallMask.CELL_SELECTED, np.int8(Structures.SELECTED), np.int8(Structures.EMPTY)
+        )
+        grid[1::2, 2::2] = passage(WallMask.EAST, WallMask.EAST_SELECTED)
+        grid[2::2, 1::2] = passage(WallMask.SOUTH, WallMask.SOUTH_SELECTED)
+        grid[0, 1::2] = np.where(mask[0] & WallMask.NORTH, np.int8(Structures.WALL), np.int8(Structures.EMPTY))
+        grid[1::2, 0] = np.where(mask[:, 0] & WallMask.WEST, np.int8(Structures.WALL), np.int8(Structures.EMPTY))
+        return maze
+
+    def to_packed_walls(self) -> np.ndarray:
+        """
+        Encode the structure of the maze in 2 bits per cell: whether its east and south walls are closed.
+        SELECTED markings are dropped and the outer border is assumed to be closed.
+        :return: The bits of the (height, width, 2) east/south wall array, packed with np.packbits.
+        """
+        walls = np.stack(
+            (self.grid[1::2, 2::2] == Structures.WALL, self.grid[2::2, 1::2] == Structures.WALL), axis=-1
+        )
+        return np.packbits(walls)
+
+    @classmethod
+    def from_packed_walls(cls, packed: np.ndarray, width: int, height: int) -> 'Maze':
+        """
+        Create a maze from the 2 bits per cell representation made by to_packed_walls.
+        :param packed: The packed wall bits.
+        :param width: The width of the maze.
+        :param height: The height of the maze.
+        :return: The decoded maze.
+        """
+        walls = np.unpackbits(packed, count=2 * width * height).view(np.bool_).reshape(height, width, 2)
+        maze = cls(width, height)
+        maze.grid[1::2, 2::2] = np.where(walls[:, :, 0], np.int8(Structures.WALL), np.int8(Structures.EMPTY))
+        maze.grid[2::2, 1::2] = np.where(walls[:, :, 1], np.int8(Structures.WALL), np.int8(Structures.EMPTY))
+        return maze
+
     def reset(self) -> None:
         """
         Reset the maze to its initial state.
         """
-        self.grid.fill(Structures.WALL)
-        self.grid[1::2, 1::2] = Structures.EMPTY
+        self.invalidate_adjacency()
+        for _, rows in self.row_blocks():
+            rows.fill(Structures.WALL)
+            rows[1::2, 1::2] = Structures.EMPTY
 
-    def display(self) -> None:
+    def display(self, pixels_per_cell: int = pixels_per_cell) -> None:
         """
         Display the maze on the screen.
+        :param pixels_per_cell: The width and height in pixels of every grid square.
         """
-        plt.imshow(self.grid, cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL)
-        plt.xticks([]), plt.yticks([])
-        plt.show()
+        self._show(Raster.render(self.grid, pixels_per_cell))
 
-    def display_path(self, path):
+    def display_path(self, path, pixels_per_cell: int = pixels_per_cell):
         """
         Display the maze with the path overlayed.
         :param path: List[Tuple[int, int]], the path to display on the maze.
+        :param pixels_per_cell: The width and height in pixels of every grid square.
         """
-        fig, ax = plt.subplots(figsize=(max(self.width / 5, 10), max(self.height / 5, 10)))
-        ax.set_xticks([]), ax.set_yticks([])
+        self._show(Raster.render(self.grid, pixels_per_cell, path))
 
-        # Plot the maze
-        ax.imshow(self.grid, cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL)
-
-        base_size = 10
-        marker_size = base_size * min(1, base_size / max(self.width, self.height))
-
-        linewidth = base_size * min(1, base_size / max(self.width, self.height)) * 0.5
-
-        # Plot the path
-        path_y, path_x = zip(*path)
-        ax.plot(path_x, path_y, marker='o', color='red', markersize=marker_size, linewidth=linewidth)
+    @staticmethod
+    def _show(image: np.ndarray) -> None:
+        """
+        Show a rendered maze image on the screen at its own resolution.
+        """
+        import matplotlib.pyplot as plt
 
+        dpi = plt.rcParams['figure.dpi']
+        fig = plt.figure(figsize=(image.shape[1] / dpi, image.shape[0] / dpi), dpi=dpi)
+        ax = fig.add_axes((0, 0, 1, 1))
+        ax.set_axis_off()
+        ax.imshow(image, interpolation='nearest')
         plt.show()
 
-    def save_path(self, path, filename: str):
+    def save_path(self, path, filename: str, pixels_per_cell: int = pixels_per_cell):
         """
-        Display the maze with the path overlayed.
+        Save the maze with the path overlayed as a PNG image.
         :param path: List[Tuple[int, int]], the path to display on the maze.
         :param filename: str, the path to save the image
+        :param pixels_per_cell: The width and height in pixels of every grid square.
         """
-        fig, ax = plt.subplots(figsize=(max(self.width / 5, 10), max(self.height / 5, 10)))
-        ax.set_xticks([]), ax.set_yticks([])
+        Raster.write_png(filename, self.grid, pixels_per_cell, path)
 
-        # Plot the maze
-        ax.imshow(self.grid, cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL)
-
-        base_size = 15
-        marker_size = base_size * min(1, base_size / max(self.width, self.height))
-
-        linewidth = base_size * min(1, base_size / max(self.width, self.height)) * 0.5
-
-        # Plot the path
-        path_y, path_x = zip(*path)
-        ax.plot(path_x, path_y, marker='o', color='red', markersize=marker_size, linewidth=linewidth)
-
-        plt.savefig(filename, bbox_inches='tight')
-        plt.close()
-
-    def save(self, filename: str) -> None:
+    def save(self, filename: str, pixels_per_cell: int = pixels_per_cell) -> None:
         """
-        Save the maze to a file with the given filename.
+        Save the maze as a PNG image with the given filename.
+        The image is written in strips of rows, so this also works for memmapped mazes without loading them.
         :param filename: The name of the file to save.
+        :param pixels_per_cell: The width and height in pixels of every grid square.
         """
-        # Adjust figure size based on maze dimensions
-        fig, ax = plt.subplots(figsize=(max(self.width / 5, 10), max(self.height / 5, 10)))
-        ax.set_xticks([]), ax.set_yticks([])
-        ax.imshow(self.grid, cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL)
-        plt.savefig(filename, bbox_inches='tight')
-        plt.close()
+        Raster.write_png(filename, self.grid, pixels_per_cell)
 
 
 class MazeGenerator:
     """
     A super class to bundle the maze generator classes.
+
+    Every generator implements its algorithm once, in iter_events, as a stream of carve events. generate() runs the
+    stream without looking at it, while animate() and save_animation() turn it into an animation, so they can not
+    diverge.
     """
 
-    def __init__(self, maze: Maze) -> None:
+    # The delay between the frames of animations, in milliseconds
+    frame_interval = 100
+
+    def __init__(self, maze: Maze, seed: int = None, rng: np.random.Generator = None) -> None:
+        """
+        :param maze: The maze to generate.
+        :param seed: The seed of the random number generators, recorded in maze.seed (see random_state).
+        :param rng: A NumPy Generator to draw from instead of seeding a new one (see random_state).
+        """
         self.maze = maze
+        self.maze.generator = type(self).__name__
+        self.seed, self.rng, self.random = random_state(seed, rng)
+        self.maze.seed = self.seed
 
-    def generate(self):
-        raise NotImplementedError("You should implement this method in subclasses.")
+    def carve(self, rows, columns, values) -> Tuple:
+        """
+        Write to the maze grid and return the write as an event (see iter_events).
+        :param rows: The grid rows to write, as a number, a sequence of numbers or a slice.
+        :param columns: The grid columns to write, in the same form as rows.
+        :param values: The structures to write, a single one or one for every square.
+        :return: The (rows, columns, values) event.
+        """
+        self.maze.invalidate_adjacency()
+        if type(rows) is tuple and type(values) is int:
+            # A few squares written one by one, which is much faster than converting them to a fancy index
+            grid = self.maze.grid
+            for square in zip(rows, columns):
+                grid[square] = values
+        else:
+            self.maze.grid[rows, columns] = values
+        return rows, columns, values
 
-    def animate(self):
+    def iter_events(self, batch: bool = False) -> Iterator[Tuple]:
+        """
+        Generate the maze as a stream of carve events, one for every step of the algorithm.
+
+        An event is a (rows, columns, values) write to the maze grid, in the NumPy indexing form grid[rows, columns] =
+        values: rows and columns are numbers, sequences of numbers or slices. The generator has applied an event to
+        the grid by the time it is yielded, so consumers can look at the grid, or patch their own copy of it (such as a
+        rendered image) with only the squares the event changed. Values may be a view of the grid.
+        :param batch: May the vectorized generators combine many steps into one event? This only changes how the
+        writes are grouped, not the random draws, so a seed gives the same maze either way.
+        :return: An iterator over the events.
+        """
         raise NotImplementedError("You should implement this method in subclasses.")
 
+    def generate(self) -> None:
+        """
+        Generate the maze by running iter_events to the end, in batches.
+        """
+        deque(self.iter_events(batch=True), maxlen=0)
+
+    def animate(self, **kwargs) -> 'FuncAnimation':
+        """
+        Generate an animation of the maze generation, with one frame for every event of iter_events.
+        A single image is updated from the grid on every frame, and a red dot marks the last square of the event. The
+        events are produced while the animation is saved, so no frames are kept in memory.
+        :param kwargs: Extra keyword arguments passed to iter_events.
+        :return: The animation of the maze generation.
+        """
+        import matplotlib.pyplot as plt
+        from matplotlib.animation import FuncAnimation
+
+        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
+        ax.set_xticks([]), ax.set_yticks([])
+
+        # Calculate marker size based on maze dimensions
+        base_size = 10
+        marker_size = base_size * min(1, base_size / max(self.maze.width, self.maze.height))
+
+        image = ax.imshow(self.maze.grid, cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL, animated=True)
+        red_dot, = ax.plot([], [], marker='o', color='red', markersize=marker_size, animated=True)
+
+        def update(event):
+            rows, columns, _ = event
+            image.set_data(self.maze.grid)
+            if isinstance(rows, slice) or isinstance(columns, slice):
+                red_dot.set_data([], [])
+            else:
+                red_dot.set_data(np.ravel(columns)[-1:], np.ravel(rows)[-1:])
+            return [image, red_dot]
+
+        return FuncAnimation(
+            fig,
+            update,
+            frames=lambda: self.iter_events(**kwargs),
+            init_func=lambda: [image, red_dot],
+            interval=self.frame_interval,
+            blit=True,
+            cache_frame_data=False
+        )
+
+    def save_animation(self, filename: str, pixels_per_cell: int = pixels_per_cell, **kwargs) -> None:
+        """
+        Generate the maze and stream a video of the generation to a file, with one frame for every event of
+        iter_events. Only the squares of every event are rendered again and the last one is marked in red.
+        :param filename: The name of the video file.
+        :param pixels_per_cell: The width and height in pixels of every grid square.
+        :param kwargs: Extra keyword arguments passed to iter_events.
+        """
+        with VideoWriter(filename, self.maze.grid, 1000 / self.frame_interval, pixels_per_cell) as video:
+            for number, (rows, columns, _) in enumerate(self.iter_events(**kwargs)):
+                if number == 0:
+                    video.update()  # The maze was reset before the first event
+                else:
+                    video.update(rows, columns)
+                if isinstance(rows, slice) or isinstance(columns, slice):
+                    video.write_frame()
+                else:
+                    video.write_frame([(np.ravel(rows)[-1], np.ravel(columns)[-1], Raster.PATH)])
+
     def run(
             self,
             maze_filename: str,
             animate: bool = True,
-            animation_filename: str = "maze_animation.mp4"
+            animation_filename: str = "maze_animation.mp4",
+            cache=None
     ) -> None:
         """
         Do a full maze generation run (possibly save the animation of the generation).
+        :param cache: A Cache.MazeCache to take the maze from if it was generated before (not used when animating).
         """
         if not animate:
-            self.generate()
+            if cache is None:
+                self.generate()
+            else:
+                cache.generate(self)
             self.maze.save(maze_filename)
         else:
             print("generating animation")
-            ani = self.animate()
-            print("saving animation")
-            ani.save(animation_filename, writer='ffmpeg')
+            self.save_animation(animation_filename)
             self.maze.save(maze_filename)
 
 
 class Solver:
     """
     A super class to bundle the maze solver classes.
+
+    Solvers only read the maze. The cells and passages they visit are marked in their own overlay, which is drawn
+    over the maze when a solution or animation is rendered (see Raster.compose), so several solvers can solve one
+    maze at the same time. The overlay takes one byte per cell, with the selection bits of WallMask: whether the cell
+    and the passages to its east and south are SELECTED, or whether it is a FILLED dead end.
     """
 
-    def __init__(self, maze: Maze, reverse_path=True) -> None:
+    # The delay between the frames of animations, in milliseconds
+    frame_interval = 100
+
+    def __init__(self, maze: Maze, reverse_path=True, seed: int = None, rng: np.random.Generator = None) -> None:
+        """
+        :param maze: The maze to solve.
+        :param reverse_path: Should the path be animated in reverse order?
+        :param seed: The seed of the random number generators, for the solvers that make random decisions.
+        :param rng: A NumPy Generator to draw from instead of seeding a new one (see random_state).
+        """
         self.maze = maze
-        self.ims = []
+        self.seed, self.rng, self.random = random_state(seed, rng)
+        self.video = None  # The VideoWriter of the animation being made
+        # The marks of the solver (WallMask selection bits) for every cell of the maze, and a flat view by cell id
+        self.overlay = np.zeros((maze.height, maze.width), dtype=np.uint8)
+        self.marks = memoryview(self.overlay.reshape(-1))
         self.path = []
-        self.visited = np.zeros_like(maze.grid, dtype=bool)
+        self.expanded = 0  # The number of cells the search expanded, for the solvers that count them
         self.reverse_path = reverse_path
 
     # def solve(self, start, end, animate=False, animation_filename=""):
@@ -167,58 +617,76 @@ class Solver:
 
     def solve(self, start, end, animate=False, animation_filename=""):
         """
-        Solve the maze using Dijkstra's algorithm.
+        Solve the maze, and stream an animation of the solving to a file if asked to.
+        Without an animation this is pure computation: no figures are made and matplotlib is never imported.
         :param start: Tuple[int, int], the starting point of the maze.
         :param end: Tuple[int, int], the ending point of the maze.
+        :param animate: Should an animation of the solving be saved?
+        :param animation_filename: The name of the video file of the animation.
         :return: List[Tuple[int, int]], the path from start to end.
         """
-        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
-        ax.set_xticks([]), ax.set_yticks([])
-        self.solve_setup(start, end, ax, animate=animate)
         if not animate:
+            self.solve_setup(start, end)
             self.solve_step(start, end, animate)
-            self.maze.grid[2 * end[0] + 1, 2 * end[1] + 1] = Structures.SELECTED
+            self.overlay[end] |= WallMask.CELL_SELECTED
             return self.path
 
         print("generating animation")
+        with VideoWriter(
+                animation_filename, self.maze.grid, 1000 / self.frame_interval, pixels_per_cell, self.overlay
+        ) as video:
+            self.video = video
+            self.solve_setup(start, end, animate=animate)
+            self.solve_step(start, end, animate)
+            self.overlay[end] |= WallMask.CELL_SELECTED
+            self.add_frame()
+
+            # Draw the path one point at a time, with the current point marked in green
+            path = self.path[::-1] if self.reverse_path else self.path
+            for i in range(len(path)):
+                video.paint(Raster.path_squares(path[max(i - 1, 0):i + 1]), Raster.PATH)
+                video.write_frame([(*path[i], Raster.MARKER)])
+            print("saving animation")
+        self.video = None
+        return self.path
 
-        self.solve_step(start, end, animate)
-
-        self.maze.grid[2 * end[0] + 1, 2 * end[1] + 1] = Structures.SELECTED
-        im = self.add_image(ax)
-
-        if self.reverse_path:
-            path = self.path[::-1]
-        else:
-            path = self.path
-
-        for i in range(1, len(path) + 1):
-            # Plot the path
-            cur_path = path[:i]
-            path_y, path_x = zip(*cur_path)
-            path_graph, = ax.plot(path_x, path_y, marker='o', color='red', markersize=5, linewidth=2)
-
-            green_dot, = ax.plot(
-                cur_path[-1][1], cur_path[-1][0],
-                marker='o',
-                color='green',
-                markersize=5,
-                animated=True
-            )
-            self.ims.append([im, path_graph, green_dot])
+    def save_path(self, filename: str, pixels_per_cell: int = pixels_per_cell) -> None:
+        """
+        Save an image of the maze with the marks of the solver and the path it found.
+        :param filename: The name of the PNG file.
+        :param pixels_per_cell: The width and height in pixels of every grid square.
+        """
+        Raster.write_png(filename, self.maze.grid, pixels_per_cell, self.path, overlay=self.overlay)
 
-        print("saving animation")
-        ani = ArtistAnimation(fig, self.ims, interval=100, blit=True)
-        ani.save(animation_filename, writer='ffmpeg')
-        plt.close()
-        return self.path
+    def add_frame(self, marks=()) -> None:
+        """
+        Write the current state of the maze to the animation, if one is being made.
+        :param marks: (row, column, palette index) squares to draw over this frame only (see VideoWriter.write_frame).
+        """
+        if self.video is not None:
+            self.video.update()
+            self.video.write_frame(marks)
 
-    def add_image(self, ax):
-        im = plt.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL,
-                        animated=True)
-        self.ims.append([im])
+    def select(self, cell: int, previous: int = None) -> None:
+        """
+        Mark a cell as SELECTED in the overlay, and the passage to it from the cell it was reached from.
+        :param cell: The id of the cell (row * width + column, see Adjacency.cell).
+        :param previous: The id of the neighbouring cell it was reached from, if any.
+        """
+        self.marks[cell] |= WallMask.CELL_SELECTED
+        if previous is not None:
+            self.select_passage(previous, cell)
 
-        return ax.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL)
+    def select_passage(self, first: int, second: int) -> None:
+        """
+        Mark the passage between two neighbouring cells as SELECTED in the overlay.
+        :param first: The id of one of the cells.
+        :param second: The id of the other cell.
+        """
+        if first > second:
+            first, second = second, first
+        # The passage is stored with the cell to its west or north
+        self.marks[first] |= WallMask.SOUTH_SELECTED if second - first == self.maze.width else WallMask.EAST_SELECTED
 
     def solve_step(self, start, end, animate):
         raise NotImplementedError("You should implement this method in subclasses.")
@@ -226,5 +694,6 @@ class Solver:
     # def solve_setup(self):
     #     raise NotImplementedError("You should implement this method in subclasses.")
 
-    def solve_setup(self, start=None, end=None, ax=None, animate=False):
-        self.visited.fill(False)
+    def solve_setup(self, start=None, end=None, animate=False):
+        self.overlay.fill(0)
+        self.expanded = 0
@@ -0,0 +1,145 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from Analysis import CHUNK, distance_field, passage_count
+from Maze import Maze
+
+
+class PathIndex:
+    """
+    A precomputed index of a perfect maze that answers path queries between any two cells without searching.
+
+    A perfect maze is a spanning tree of its cells, so the path between two cells is unique: it runs from both cells
+    up to their lowest common ancestor (LCA) in the tree hanging from a root cell. The index holds the depth of every
+    cell and, for binary lifting, its 2^k-th ancestor for every k, computed with a breadth-first distance field from the
+    root (see Analysis.distance_field) and log2(depth) vectorized rounds of pointer doubling.
+
+    The LCA of a pair is found in O(log n) by first lifting the deeper cell to the depth of the other one and then
+    lifting both as long as their ancestors differ. The batched methods run these steps on whole arrays of queries, so
+    millions of queries take a few dozen vectorized passes. The length of a path follows from the depths of its ends
+    and their LCA, the path itself is walked up from both ends in O(path).
+    """
+
+    def __init__(self, maze: Maze, root: Tuple[int, int] = (0, 0)) -> None:
+        """
+        :param maze: The perfect maze to index.
+        :param root: The (row, column) of the root cell of the tree.
+        """
+        width, height = maze.width, maze.height
+        self.width, self.height = width, height
+        self.root = root
+
+        depth, parent_direction = distance_field(maze, root)
+        if passage_count(maze) != width * height - 1 or (depth < 0).any():
+            raise ValueError("The maze is not perfect (it has loops or cells that can not be reached)")
+        self.depth = depth.reshape(-1)
+
+        # The parent of every cell, the root is its own parent so lifting past it stays at the root
+        offsets = np.array([-width, 1, width, -1, 0], dtype=np.int32)
+        parent = np.arange(width * height, dtype=np.int32)
+        parent += offsets[parent_direction.reshape(-1)]  # The direction -1 of the root picks offset 0
+
+        # ancestors[k, cell] is the 2^k-th ancestor of the cell
+        levels = max(1, int(self.depth.max()).bit_length())
+        self.ancestors = np.empty((levels, width * height), dtype=np.int32)
+        self.ancestors[0] = parent
+        for level in range(1, levels):
+            np.take(self.ancestors[level - 1], self.ancestors[level - 1], out=self.ancestors[level])
+
+    def cell_ids(self, cells) -> np.ndarray:
+        """
+        :param cells: The (row, column) of a cell, or an (n, 2) array of them.
+        :return: The ids (row * width + column) of the cells, as an int64 array of length n.
+        """
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        if ((cells < 0) | (cells >= (self.height, self.width))).any():
+            raise ValueError(f"Cells outside of the {self.width}x{self.height} maze")
+        return cells[:, 0] * self.width + cells[:, 1]
+
+    def _lca_ids(self, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        """
+        Find the lowest common ancestors of pairs of cells by binary lifting.
+        :param first: The ids of the first cells of the pairs.
+        :param second: The ids of the second cells of the pairs.
+        :return: The ids of the lowest common ancestors.
+        """
+        ancestors, depth = self.ancestors, self.depth
+        first_depth, second_depth = depth[first], depth[second]
+        deeper = np.where(first_depth >= second_depth, first, second)
+        other = np.where(first_depth >= second_depth, second, first)
+
+        # Lift the deeper cell to the depth of the other one, one bit of the difference at a time
+        difference = np.abs(first_depth - second_depth)
+        for level in range(len(ancestors)):
+            lift = (difference >> level) & 1 != 0
+            deeper[lift] = ancestors[level][deeper[lift]]
+
+        # Lift both as far as their ancestors differ, they then hang just below the LCA
+        for level in reversed(range(len(ancestors))):
+            deeper_ancestor, other_ancestor = ancestors[level][deeper], ancestors[level][other]
+            differ = deeper_ancestor != other_ancestor
+            deeper[differ] = deeper_ancestor[differ]
+            other[differ] = other_ancestor[differ]
+        return np.where(deeper == other, deeper, ancestors[0][deeper])
+
+    def lowest_common_ancestors(self, starts, ends) -> np.ndarray:
+        """
+        Find the cells where the paths between pairs of cells turn around, the cells of the paths closest to the root.
+        :param starts: An (n, 2) array of the (row, column) of the first cells of the pairs.
+        :param ends: An (n, 2) array of the (row, column) of the second cells of the pairs.
+        :return: An (n, 2) array of the (row, column) of the lowest common ancestors.
+        """
+        starts, ends = self.cell_ids(starts), self.cell_ids(ends)
+        if len(starts) != len(ends):
+            raise ValueError("There must be as many ends as starts")
+        result = np.empty(len(starts), dtype=np.int64)
+        for first in range(0, len(starts), CHUNK):
+            chunk = slice(first, first + CHUNK)
+            result[chunk] = self._lca_ids(starts[chunk], ends[chunk])
+        return np.stack(np.divmod(result, self.width), axis=1)
+
+    def distances(self, starts, ends) -> np.ndarray:
+        """
+        Find the lengths of the paths between pairs of cells.
+        :param starts: An (n, 2) array of the (row, column) of the first cells of the pairs.
+        :param ends: An (n, 2) array of the (row, column) of the second cells of the pairs.
+        :return: An int64 array with the number of steps of every path.
+        """
+        starts, ends = self.cell_ids(starts), self.cell_ids(ends)
+        if len(starts) != len(ends):
+            raise ValueError("There must be as many ends as starts")
+        result = np.empty(len(starts), dtype=np.int64)
+        depth = self.depth
+        for first in range(0, len(starts), CHUNK):
+            chunk = slice(first, first + CHUNK)
+            lca = self._lca_ids(starts[chunk], ends[chunk])
+            result[chunk] = depth[starts[chunk]].astype(np.int64) + depth[ends[chunk]] - 2 * depth[lca].astype(np.int64)
+        return result
+
+    def distance(self, start: Tuple[int, int], end: Tuple[int, int]) -> int:
+        """
+        :param start: The (row, column) of the first cell.
+        :param end: The (row, column) of the second cell.
+        :return: The number of steps of the path between the cells.
+        """
+        return int(self.distances(start, end)[0])
+
+    def path(self, start: Tuple[int, int], end: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """
+        Find the path between two cells, by walking up from both cells to their lowest common ancestor.
+        :param start: The (row, column) of the first cell.
+        :param end: The (row, column) of the second cell.
+        :return: The path from start to end as grid positions (the form the solvers return).
+        """
+        start_id, end_id = self.cell_ids([start, end]).tolist()
+        lca = int(self._lca_ids(np.array([start_id]), np.array([end_id]))[0])
+        parent = self.ancestors[0]
+
+        up, down = [start_id], [end_id]
+        while up[-1] != lca:
+            up.append(int(parent[up[-1]]))
+        while down[-1] != lca:
+            down.append(int(parent[down[-1]]))
+        cells = up + down[-2::-1]
+        return [(2 * (cell // self.width) + 1, 2 * (cell % self.width) + 1) for cell in cells]
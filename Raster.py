@@ -0,0 +1,179 @@
+import struct
+import zlib
+
+import numpy as np
+
+from settings import Structures, WallMask
+
+# Palette index of the path overlay, right after the Structures codes
+PATH = Structures.WALL + 1
+# Palette index of the marker of the current position in animations
+MARKER = PATH + 1
+
+# The colour of every palette index. The Structures codes follow the 'binary' colormap (EMPTY white, WALL black)
+# that the maze images used to be rendered with, the path is drawn in red.
+PALETTE = np.array([
+    [255, 255, 255],  # EMPTY
+    [191, 191, 191],
+    [128, 128, 128],  # SELECTED
+    [64, 64, 64],  # Filled dead ends (WALL - 1)
+    [0, 0, 0],  # WALL
+    [255, 0, 0],  # PATH
+    [0, 128, 0],  # MARKER
+], dtype=np.uint8)
+
+# Palette index of every int8 grid value (viewed as uint8), values outside EMPTY .. WALL are clipped like imshow does
+_PALETTE_INDEX = np.clip(
+    np.arange(256, dtype=np.uint8).view(np.int8), Structures.EMPTY, Structures.WALL
+).astype(np.uint8)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Upper bound on the number of image bytes built at once when writing a PNG
+STRIP_BYTES = 1 << 24
+
+
+def path_squares(path) -> np.ndarray:
+    """
+    Get all grid squares covered by a path, filling in the squares between consecutive points on the same row or
+    column (the walls that were passed through).
+    :param path: List[Tuple[int, int]], the (row, column) grid positions of the path.
+    :return: An (n, 2) array of the covered grid positions.
+    """
+    points = np.asarray(path, dtype=np.int64).reshape(-1, 2)
+    if len(points) < 2:
+        return points
+
+    steps = points[1:] - points[:-1]
+    straight = (steps == 0).any(axis=1)
+    lengths = np.where(straight, np.abs(steps).max(axis=1), 1)
+    directions = np.where(straight[:, None], np.sign(steps), 0)
+
+    # Every segment contributes its start and the squares up to (not including) its end
+    segment = np.repeat(np.arange(len(steps)), lengths)
+    offsets = np.arange(len(segment)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    squares = points[segment] + directions[segment] * offsets[:, None]
+    return np.concatenate((squares, points[-1:]))
+
+
+def palette_index(squares) -> np.ndarray:
+    """
+    Get the palette indices of grid squares.
+    :param squares: The grid values, a number or an array of them.
+    :return: A uint8 array of the palette indices, with the shape of squares.
+    """
+    return _PALETTE_INDEX[np.asarray(squares, dtype=np.int8).view(np.uint8)]
+
+
+def _overlay_squares(overlay: np.ndarray, first_row: int, last_row: int) -> np.ndarray:
+    """
+    Expand the per cell marks of a solver to the grid squares in the rows first_row .. last_row - 1.
+    Passages are marked whether they are open or not, compose only draws the marks on open squares.
+    :param overlay: The (height, width) overlay of the whole maze (see Solver.overlay).
+    :return: The Structures mark (EMPTY for none) of every square.
+    """
+    height, width = overlay.shape
+    # The cells of the rows, with a cell row more on both sides for the passages on the first and last row
+    first_cell, last_cell = max(0, first_row // 2 - 1), min(height, last_row // 2 + 1)
+    cells = overlay[first_cell:last_cell]
+    filled = (cells & WallMask.FILLED) != 0
+
+    def marks(selected: np.ndarray, filled: np.ndarray) -> np.ndarray:
+        return np.where(filled, np.int8(Structures.WALL - 1), selected.view(np.int8) * np.int8(Structures.SELECTED))
+
+    squares = np.zeros((2 * (last_cell - first_cell) + 1, 2 * width + 1), dtype=np.int8)
+    squares[1::2, 1::2] = marks((cells & WallMask.CELL_SELECTED) != 0, filled)
+    squares[1::2, 2:-1:2] = marks((cells[:, :-1] & WallMask.EAST_SELECTED) != 0, filled[:, :-1] | filled[:, 1:])
+    squares[2:-1:2, 1::2] = marks((cells[:-1] & WallMask.SOUTH_SELECTED) != 0, filled[:-1] | filled[1:])
+    return squares[first_row - 2 * first_cell:last_row - 2 * first_cell]
+
+
+def compose(grid: np.ndarray, overlay: np.ndarray, first_row: int = 0) -> np.ndarray:
+    """
+    Draw the marks of a solver over the walls of a maze (see Solver.overlay). The maze is shown without the marks it
+    may have been generated with, as the solvers used to clear them before solving.
+    The overlay is kept per cell, it is only expanded to grid squares here for the rows being drawn.
+    :param grid: A block of rows of the maze grid.
+    :param overlay: The (height, width) overlay of the whole maze.
+    :param first_row: The grid row of the first row of the block.
+    :return: The composed grid squares.
+    """
+    walls = grid == Structures.WALL
+    return np.where(walls, np.int8(Structures.WALL), _overlay_squares(overlay, first_row, first_row + len(grid)))
+
+
+def _index_rows(
+        grid: np.ndarray, first_row: int, last_row: int, path: np.ndarray, overlay: np.ndarray = None
+) -> np.ndarray:
+    """
+    Get the palette indices of the grid squares in the rows first_row .. last_row - 1, with the overlay (if any) and
+    the path drawn over them.
+    """
+    squares = grid[first_row:last_row]
+    if overlay is not None:
+        squares = compose(squares, overlay, first_row)
+    indices = palette_index(squares)
+    if path is not None:
+        on_rows = path[(path[:, 0] >= first_row) & (path[:, 0] < last_row)]
+        indices[on_rows[:, 0] - first_row, on_rows[:, 1]] = PATH
+    return indices
+
+
+def render(grid: np.ndarray, pixels_per_cell: int = 1, path=None, overlay: np.ndarray = None) -> np.ndarray:
+    """
+    Render a maze grid to an RGB image.
+    :param grid: The maze grid.
+    :param pixels_per_cell: The width and height in pixels of every grid square.
+    :param path: List[Tuple[int, int]], an optional path (in grid positions) to draw over the maze.
+    :param overlay: The optional marks of a solver to draw over the maze (see compose).
+    :return: An array of shape (rows * pixels_per_cell, columns * pixels_per_cell, 3).
+    """
+    squares = None if path is None else path_squares(path)
+    indices = _index_rows(grid, 0, grid.shape[0], squares, overlay)
+    indices = np.repeat(np.repeat(indices, pixels_per_cell, axis=0), pixels_per_cell, axis=1)
+    return PALETTE[indices]
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(data, zlib.crc32(kind)))
+
+
+def write_png(
+        filename: str, grid: np.ndarray, pixels_per_cell: int = 1, path=None, level: int = 6, overlay: np.ndarray = None
+) -> None:
+    """
+    Write a maze grid to a palette PNG file, pixel for pixel, without going through a plotting library.
+
+    The image is built and compressed in strips of grid rows, so memory use does not grow with the maze (the grid may
+    be memmapped). Only the first scanline of every grid row holds pixels, its copies use the PNG 'Up' filter and are
+    all zeros, which makes them nearly free to compress.
+    :param filename: The name of the file to write.
+    :param grid: The maze grid.
+    :param pixels_per_cell: The width and height in pixels of every grid square.
+    :param path: List[Tuple[int, int]], an optional path (in grid positions) to draw over the maze.
+    :param level: The zlib compression level.
+    :param overlay: The optional marks of a solver to draw over the maze (see compose).
+    """
+    rows, columns = grid.shape
+    width = columns * pixels_per_cell
+    squares = None if path is None else path_squares(path)
+    rows_per_strip = max(1, STRIP_BYTES // ((width + 1) * pixels_per_cell))
+
+    # Scanlines of a grid row: a filter byte followed by the pixels, the first one stored and the others copies
+    strip = np.zeros((rows_per_strip, pixels_per_cell, width + 1), dtype=np.uint8)
+    strip[:, 1:, 0] = 2  # Up filter
+
+    compressor = zlib.compressobj(level)
+    with open(filename, 'wb') as file:
+        file.write(PNG_SIGNATURE)
+        file.write(_chunk(b'IHDR', struct.pack('>IIBBBBB', width, rows * pixels_per_cell, 8, 3, 0, 0, 0)))
+        file.write(_chunk(b'PLTE', PALETTE.tobytes()))
+        for first_row in range(0, rows, rows_per_strip):
+            last_row = min(first_row + rows_per_strip, rows)
+            indices = _index_rows(grid, first_row, last_row, squares, overlay)
+            strip[:last_row - first_row, 0, 1:] = np.repeat(indices, pixels_per_cell, axis=1)
+            data = compressor.compress(strip[:last_row - first_row].data)
+            if data:
+                file.write(_chunk(b'IDAT', data))
+        file.write(_chunk(b'IDAT', compressor.flush()))
+        file.write(_chunk(b'IEND', b''))
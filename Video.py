@@ -0,0 +1,97 @@
+import subprocess
+
+import numpy as np
+
+import Raster
+
+# The encoder of the videos, found on the PATH
+FFMPEG = 'ffmpeg'
+
+
+class VideoWriter:
+    """
+    Streams the frames of a maze animation to an ffmpeg subprocess, without going through a plotting library.
+
+    The writer keeps one frame of palette indices (see Raster.PALETTE) with one pixel per grid square. After the grid
+    changed, only the changed squares are looked up again (see update), and every written frame is converted to raw
+    RGB bytes and piped to ffmpeg, which upscales it to pixels_per_cell and encodes it. No frames are kept, so memory
+    use does not depend on the number of frames.
+    """
+
+    def __init__(
+            self, filename: str, grid: np.ndarray, fps: float = 10, pixels_per_cell: int = 1, overlay: np.ndarray = None
+    ) -> None:
+        """
+        :param filename: The name of the video file to write, its extension selects the container.
+        :param grid: The maze grid the frames show, it is read again on every update.
+        :param fps: The number of frames per second.
+        :param pixels_per_cell: The width and height in pixels of every grid square in the video.
+        :param overlay: The marks of a solver to draw over the grid (see Raster.compose), read again on every update.
+        """
+        self.grid = grid
+        self.overlay = overlay
+        self.indices = np.empty(grid.shape, dtype=np.uint8)
+        self.update()
+        rows, columns = grid.shape
+        self.process = subprocess.Popen(
+            [
+                FFMPEG, '-y', '-loglevel', 'error',
+                '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{columns}x{rows}', '-framerate', str(fps), '-i', '-',
+                # Upscale without blurring, H.264 in yuv420p needs an even width and height
+                '-vf', f'scale=iw*{pixels_per_cell}:ih*{pixels_per_cell}:flags=neighbor,pad=ceil(iw/2)*2:ceil(ih/2)*2',
+                '-pix_fmt', 'yuv420p',
+                filename
+            ],
+            stdin=subprocess.PIPE
+        )
+        self.frames = 0
+
+    def update(self, rows=slice(None), columns=slice(None)) -> None:
+        """
+        Look up the palette indices of grid squares that changed, the whole grid by default.
+        :param rows: The grid rows of the squares, as a number, a sequence of numbers or a slice.
+        :param columns: The grid columns of the squares, in the same form as rows.
+        """
+        if self.overlay is None:
+            squares = self.grid[rows, columns]
+        else:
+            squares = Raster.compose(self.grid, self.overlay)[rows, columns]
+        self.indices[rows, columns] = Raster.palette_index(squares)
+
+    def paint(self, squares, index: int) -> None:
+        """
+        Paint squares of the frame in a palette colour, without changing the grid (until they are updated again).
+        :param squares: An (n, 2) array of the (row, column) grid positions of the squares.
+        :param index: The palette index to paint.
+        """
+        squares = np.asarray(squares).reshape(-1, 2)
+        self.indices[squares[:, 0], squares[:, 1]] = index
+
+    def write_frame(self, marks=()) -> None:
+        """
+        Write the current frame to the video.
+        :param marks: (row, column, palette index) squares to draw over this frame only, such as the current position.
+        """
+        frame = Raster.PALETTE[self.indices]
+        for row, column, index in marks:
+            frame[row, column] = Raster.PALETTE[index]
+        self.process.stdin.write(frame.data)
+        self.frames += 1
+
+    def close(self) -> None:
+        """
+        Finish the video and wait for ffmpeg to write it.
+        """
+        self.process.stdin.close()
+        if self.process.wait():
+            raise subprocess.CalledProcessError(self.process.returncode, self.process.args)
+
+    def __enter__(self) -> 'VideoWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.process.kill()
+            self.process.wait()
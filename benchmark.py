@@ -0,0 +1,61 @@
+import time
+
+from Analysis import MazeStatistics
+from Maze import Maze
+from generation_algoritms.Aldous_broder import AldousBroderMazeGenerator
+from generation_algoritms.Binary_tree import BinaryTreeMazeGenerator
+from generation_algoritms.Hunt_and_kill import HuntAndKillMazeGenerator
+from generation_algoritms.Prims import PrimsMazeGenerator
+from generation_algoritms.Randomized_kruskal_set import RandomizedKruskalSetMazeGenerator
+from generation_algoritms.Side_winder import SidewinderMazeGenerator
+from generation_algoritms.Sigma import SigmaMazeGenerator
+from generation_algoritms.Wilson import WilsonMazeGenerator
+
+
+def benchmark_generator(generator, sizes, **kwargs) -> None:
+    """
+    Time the generation of square mazes of the given sizes and print the time spent per cell, so the scaling of a
+    generator can be read off directly (a constant time per cell means linear scaling).
+    :param generator: The MazeGenerator subclass to benchmark.
+    :param sizes: The side lengths of the mazes to generate.
+    :param kwargs: Extra keyword arguments passed to the generator.
+    """
+    for size in sizes:
+        maze = Maze(size, size)
+        start = time.perf_counter()
+        generator(maze, **kwargs).generate()
+        elapsed = time.perf_counter() - start
+        print(f"{generator.__name__} {size}x{size}: {elapsed:.3f}s ({elapsed / (size * size) * 1e6:.3f} us/cell)")
+
+
+def profile_texture(generator, size, **kwargs) -> None:
+    """
+    Generate a square maze and print its statistics (see Analysis.MazeStatistics), to compare generator textures.
+    :param generator: The MazeGenerator subclass to profile.
+    :param size: The side length of the maze to generate.
+    :param kwargs: Extra keyword arguments passed to the generator.
+    """
+    maze = Maze(size, size)
+    generator(maze, **kwargs).generate()
+    start = time.perf_counter()
+    statistics = MazeStatistics(maze)
+    elapsed = time.perf_counter() - start
+    summary = ', '.join(f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+                        for key, value in statistics.summary().items())
+    print(f"{generator.__name__} {size}x{size} ({elapsed:.3f}s): {summary}")
+
+
+if __name__ == '__main__':
+    benchmark_generator(RandomizedKruskalSetMazeGenerator, [250, 500, 1000, 2000, 4000])
+    benchmark_generator(PrimsMazeGenerator, [250, 500, 1000, 2000])
+    benchmark_generator(SigmaMazeGenerator, [250, 500, 1000, 2000])
+    benchmark_generator(WilsonMazeGenerator, [250, 500, 1000, 2000])
+    benchmark_generator(AldousBroderMazeGenerator, [100, 200, 400], batched=False)
+    benchmark_generator(AldousBroderMazeGenerator, [100, 200, 400, 800])
+    benchmark_generator(HuntAndKillMazeGenerator, [250, 500, 1000])
+    benchmark_generator(BinaryTreeMazeGenerator, [1000, 2500, 5000, 10000])
+    benchmark_generator(SidewinderMazeGenerator, [1000, 2500, 5000, 10000])
+
+    for texture_generator in (RandomizedKruskalSetMazeGenerator, PrimsMazeGenerator, WilsonMazeGenerator,
+                              HuntAndKillMazeGenerator, BinaryTreeMazeGenerator, SidewinderMazeGenerator):
+        profile_texture(texture_generator, 500)
@@ -1,11 +1,9 @@
-import random
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 import numpy as np
-from matplotlib import pyplot as plt, animation
-from matplotlib.animation import Animation
 
 from Maze import MazeGenerator
+from generation_algoritms.Random_walk import clipped_cumsum
 from settings import Structures
 
 
@@ -22,37 +20,108 @@ class AldousBroderMazeGenerator(MazeGenerator):
             Make the chosen neighbour the current cell.
 
     This process ensures that the maze is fully connected and each cell is reachable from any other cell.
+
+    In batched mode the random walk is computed a block of steps at a time with NumPy. A move off the grid is
+    rejected (the walker stays put), which is the same as picking a random neighbour, so the generated mazes have
+    exactly the same distribution (a uniform spanning tree) as the step by step walk.
     """
-    def __init__(self, maze) -> None:
-        super().__init__(maze)
+
+    # Number of random moves drawn at once in batched mode
+    batch_size = 1 << 16
+
+    def __init__(self, maze, batched=True, seed=None, rng=None) -> None:
+        """
+        :param batched: Should we compute the random walk in vectorized blocks instead of one step at a time?
+        """
+        super().__init__(maze, seed=seed, rng=rng)
         self.visited = np.zeros((maze.height, maze.width), dtype=bool)
         self.unvisited_cells = maze.width * maze.height
+        self.batched = batched
 
-    def generate(self) -> None:
+    def iter_events(self, batch: bool = False) -> Iterator[Tuple]:
         """
-        Generates a maze with the Aldous_Broder algorithm.
+        Generates a maze with the Aldous_Broder algorithm, yielding an event for every cell added to the maze.
+        :param batch: Should the cells added by a whole block of moves be yielded as one event (batched mode only)?
         """
+        if self.batched:
+            yield from self._iter_batched_events(batch)
+            return
+
         self.maze.reset()
+        self.visited.fill(False)
+        self.unvisited_cells = self.maze.width * self.maze.height
 
         # Pick a random starting cell
-        current_x, current_y = random.randint(0, self.maze.width - 1), random.randint(0, self.maze.height - 1)
+        current_x, current_y = self.random.randint(0, self.maze.width - 1), self.random.randint(0, self.maze.height - 1)
         self.visited[current_x, current_y] = True
-        self.maze.grid[2 * current_x + 1, 2 * current_y + 1] = Structures.SELECTED  # Mark the cell as part of the maze
+        yield self.carve(2 * current_x + 1, 2 * current_y + 1, Structures.SELECTED)  # Mark the cell as part of the maze
         self.unvisited_cells -= 1
 
         while self.unvisited_cells > 0:
             neighbors = self.get_neighbors(current_x, current_y)
-            next_x, next_y, wall_x, wall_y = random.choice(neighbors)
+            next_x, next_y, wall_x, wall_y = self.random.choice(neighbors)
 
             if not self.visited[next_x, next_y]:
                 self.visited[next_x, next_y] = True
-                self.maze.grid[2 * next_x + 1 - wall_x, 2 * next_y + 1 - wall_y] = Structures.SELECTED  # Remove the wall
-                self.maze.grid[2 * next_x + 1, 2 * next_y + 1] = Structures.SELECTED  # Mark the cell as part of the maze
                 self.unvisited_cells -= 1
+                # Remove the wall and mark the cell as part of the maze
+                yield self.carve(
+                    (2 * next_x + 1 - wall_x, 2 * next_x + 1), (2 * next_y + 1 - wall_y, 2 * next_y + 1),
+                    Structures.SELECTED
+                )
 
             # Move to the chosen neighbor
             current_x, current_y = next_x, next_y
 
+    def _iter_batched_events(self, batch: bool) -> Iterator[Tuple]:
+        """
+        Generates a maze with the Aldous_Broder algorithm, computing the random walk in vectorized blocks.
+        :param batch: Should the cells added by a whole block of moves be yielded as one event?
+        """
+        self.maze.reset()
+        width, height = self.maze.width, self.maze.height
+        visited = self.visited.reshape(-1)
+        visited.fill(False)
+        self.unvisited_cells = width * height
+        d_rows = np.array([0, 1, 0, -1], dtype=np.int8)  # Right, Down, Left, Up
+        d_columns = np.array([1, 0, -1, 0], dtype=np.int8)
+
+        # Pick a random starting cell
+        row, column = self.random.randint(0, height - 1), self.random.randint(0, width - 1)
+        visited[row * width + column] = True
+        yield self.carve(2 * row + 1, 2 * column + 1, Structures.SELECTED)  # Mark the cell as part of the maze
+        self.unvisited_cells -= 1
+
+        while self.unvisited_cells > 0:
+            moves = self.rng.integers(4, size=self.batch_size)
+            rows = clipped_cumsum(d_rows[moves], row, height - 1)
+            columns = clipped_cumsum(d_columns[moves], column, width - 1)
+            cells = rows.astype(np.int64) * width + columns
+            previous = np.concatenate(([row * width + column], cells[:-1]))
+            row, column = int(rows[-1]), int(columns[-1])
+
+            # The first visit of every cell that was not part of the maze yet, in the order of the walk
+            new = np.flatnonzero(~visited[cells])
+            if len(new) == 0:
+                continue
+            _, first = np.unique(cells[new], return_index=True)
+            new = np.sort(new[first])
+
+            visited[cells[new]] = True
+            self.unvisited_cells -= len(new)
+            new_rows, new_columns = rows[new].astype(np.int64), columns[new].astype(np.int64)
+            previous_rows, previous_columns = np.divmod(previous[new], width)
+            wall_rows, wall_columns = new_rows + previous_rows + 1, new_columns + previous_columns + 1
+            cell_rows, cell_columns = 2 * new_rows + 1, 2 * new_columns + 1
+            if batch:
+                yield self.carve(
+                    np.concatenate((wall_rows, cell_rows)), np.concatenate((wall_columns, cell_columns)),
+                    Structures.SELECTED
+                )
+            else:
+                for step in zip(wall_rows.tolist(), cell_rows.tolist(), wall_columns.tolist(), cell_columns.tolist()):
+                    yield self.carve(step[:2], step[2:], Structures.SELECTED)
+
     def get_neighbors(self, x: int, y: int) -> List[Tuple[int, int, int, int]]:
         """
         Get all neighboring cells and walls for the cell at (x, y).
@@ -69,46 +138,3 @@ class AldousBroderMazeGenerator(MazeGenerator):
             if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height:
                 neighbors.append((nx, ny, dx, dy))
         return neighbors
-
-    def animate(self) -> Animation:
-        """
-        Generate an animation of the maze generation.
-        :return: The animation of the maze generation.
-        """
-        # Adjust figure size based on maze dimensions
-        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
-        ax.set_xticks([]), ax.set_yticks([])
-
-        ims = []
-
-        self.maze.reset()
-        current_x, current_y = random.randint(0, self.maze.width - 1), random.randint(0, self.maze.height - 1)
-        self.visited[current_x, current_y] = True
-        self.maze.grid[2 * current_x + 1, 2 * current_y + 1] = Structures.SELECTED  # Start cell
-        self.unvisited_cells -= 1
-
-        # Calculate marker size based on maze dimensions
-        base_size = 10
-        marker_size = base_size * min(1, base_size / max(self.maze.width, self.maze.height))
-
-        while self.unvisited_cells > 0:
-            neighbors = self.get_neighbors(current_x, current_y)
-            next_x, next_y, wall_x, wall_y = random.choice(neighbors)
-
-            if not self.visited[next_x, next_y]:
-                self.visited[next_x, next_y] = True
-                self.maze.grid[2 * next_x + 1 - wall_x, 2 * next_y + 1 - wall_y] = Structures.SELECTED  # Remove the wall
-                self.maze.grid[2 * next_x + 1, 2 * next_y + 1] = Structures.SELECTED  # Mark the cell as part of the maze
-                self.unvisited_cells -= 1
-
-            # Create the image for the current frame
-            im = ax.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL, animated=True)
-            red_dot, = ax.plot(2 * next_y + 1, 2 * next_x + 1, marker='o', color='red', markersize=marker_size, animated=True)
-
-            # Append the image and the current cell marker to the frame
-            ims.append([im, red_dot])
-
-            # Move to the chosen neighbor
-            current_x, current_y = next_x, next_y
-
-        return animation.ArtistAnimation(fig, ims, interval=100, blit=True)
@@ -1,7 +1,6 @@
-import random
+from typing import Iterator, Tuple
 
-from matplotlib import pyplot as plt, animation
-from matplotlib.animation import Animation
+import numpy as np
 
 from Maze import MazeGenerator
 from settings import Structures
@@ -14,81 +13,60 @@ class BinaryTreeMazeGenerator(MazeGenerator):
     The algorithm works as follows:
     1. For each cell in the grid, randomly choose to remove either the north or west wall (or both).
     2. This creates a maze with a strong diagonal bias, but is very efficient to generate.
-    """
 
-    def __init__(self, maze):
-        super().__init__(maze)
+    Since every cell decides on its own, all coin flips of a block of rows are drawn at once and the walls are carved
+    with slice assignments.
+    """
 
-    def generate(self) -> None:
-        """
-        Generates a maze using the Binary Tree algorithm.
-        """
-        self.maze.reset()
+    # Number of cells carved per vectorized block of rows
+    block_cells = 1 << 16
 
-        for x in range(self.maze.width):
-            for y in range(self.maze.height):
-                if x > 0 and y > 0:
-                    direction = random.choice(['north', 'west'])
-                elif x > 0:
-                    direction = 'west'
-                elif y > 0:
-                    direction = 'north'
-                else:
-                    continue
+    def __init__(self, maze, seed=None, rng=None):
+        super().__init__(maze, seed=seed, rng=rng)
 
-                if direction == 'north':
-                    self.maze.grid[2 * x + 1, 2 * y] = Structures.EMPTY
-                elif direction == 'west':
-                    self.maze.grid[2 * x, 2 * y + 1] = Structures.EMPTY
+    def draw_rows(self, first_row: int, last_row: int) -> np.ndarray:
+        """
+        Flip the coins of the rows first_row up to (not including) last_row, all at once.
 
-                self.maze.grid[2 * x + 1, 2 * y + 1] = Structures.EMPTY
+        Every cell opens the wall above it or the wall to its left. Cells in the top row can only open to the left,
+        cells in the left column can only open upwards and the top left cell opens nothing.
+        :return: A (rows, width) boolean array, True for the cells that open upwards.
+        """
+        up = self.rng.integers(2, size=(last_row - first_row, self.maze.width), dtype=np.bool_)
+        up[:, 0] = True
+        if first_row == 0:
+            up[0, :] = False
+        return up
 
-    def animate(self) -> Animation:
+    def carve_rows(self, first_row: int, last_row: int, up: np.ndarray) -> Tuple:
         """
-        Generate an animation of the maze generation.
-        :return: The animation of the maze generation.
+        Carve the rows first_row up to (not including) last_row with slice assignments.
+        :param up: The coin flips of the rows (see draw_rows).
+        :return: The event of the carved rows.
+        """
+        self.maze.invalidate_adjacency()
+        grid = self.maze.grid
+        left = ~up
+        left[:, 0] = False
+        grid[2 * first_row:2 * last_row:2, 1::2] = np.where(up, np.int8(Structures.EMPTY), np.int8(Structures.WALL))
+        grid[2 * first_row + 1:2 * last_row:2, 0:-1:2] = np.where(
+            left, np.int8(Structures.EMPTY), np.int8(Structures.WALL)
+        )
+        return slice(2 * first_row, 2 * last_row), slice(None), grid[2 * first_row:2 * last_row]
+
+    def iter_events(self, batch: bool = False) -> Iterator[Tuple]:
+        """
+        Generates a maze using the Binary Tree algorithm, yielding an event for every row of cells.
+        :param batch: Should a whole block of rows be yielded as one event?
         """
-        # Adjust figure size based on maze dimensions
-        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
-        ax.set_xticks([]), ax.set_yticks([])
-
-        ims = []
-
         self.maze.reset()
 
-        # Calculate marker size based on maze dimensions
-        base_size = 10
-        marker_size = base_size * min(1, base_size / max(self.maze.width, self.maze.height))
-
-        for x in range(self.maze.width):
-            for y in range(self.maze.height):
-                if x > 0 and y > 0:
-                    direction = random.choice(['north', 'west'])
-                elif x > 0:
-                    direction = 'west'
-                elif y > 0:
-                    direction = 'north'
-                else:
-                    continue
-
-                if direction == 'north':
-                    self.maze.grid[2 * x + 1, 2 * y] = Structures.EMPTY
-                elif direction == 'west':
-                    self.maze.grid[2 * x, 2 * y + 1] = Structures.EMPTY
-
-                self.maze.grid[2 * x + 1, 2 * y + 1] = Structures.EMPTY
-
-                # Create the image for the current frame
-                im = ax.imshow(
-                    self.maze.grid.copy(),
-                    cmap='binary',
-                    vmin=Structures.EMPTY,
-                    vmax=Structures.WALL,
-                    animated=True
-                )
-                red_dot, = ax.plot(2 * y + 1, 2 * x + 1, marker='o', color='red', markersize=marker_size, animated=True)
-
-                # Append the image and the current cell marker to the frame
-                ims.append([im, red_dot])
-
-        return animation.ArtistAnimation(fig, ims, interval=100, blit=True)
+        rows_per_block = max(1, self.block_cells // self.maze.width)
+        for first_row in range(0, self.maze.height, rows_per_block):
+            last_row = min(first_row + rows_per_block, self.maze.height)
+            up = self.draw_rows(first_row, last_row)
+            if batch:
+                yield self.carve_rows(first_row, last_row, up)
+            else:
+                for row in range(first_row, last_row):
+                    yield self.carve_rows(row, row + 1, up[row - first_row:row - first_row + 1])
@@ -0,0 +1,47 @@
+import numpy as np
+
+
+class DisjointSet:
+    """
+    A disjoint-set forest (union-find) over the integers 0 .. size - 1.
+
+    The forest is stored in two flat NumPy arrays: the parent of every element and the rank (an upper bound on the
+    height) of every root. Finding uses path halving, a one-pass form of path compression, and merging uses union by
+    rank, so any sequence of operations runs in near-linear time.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.parent = np.arange(size, dtype=np.int64)
+        self.rank = np.zeros(size, dtype=np.int8)
+
+    def find(self, item: int) -> int:
+        """
+        Find the representative (root) of the set that contains the given item.
+        :param item: The element to look up.
+        :return: The root of the set containing the element.
+        """
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first: int, second: int) -> bool:
+        """
+        Merge the sets containing the two given items.
+        :param first: An element of the first set.
+        :param second: An element of the second set.
+        :return: True if two distinct sets were merged, False if the items were already in the same set.
+        """
+        first_root = self.find(first)
+        second_root = self.find(second)
+        if first_root == second_root:
+            return False
+
+        rank = self.rank
+        if rank[first_root] < rank[second_root]:
+            first_root, second_root = second_root, first_root
+        self.parent[second_root] = first_root
+        if rank[first_root] == rank[second_root]:
+            rank[first_root] += 1
+        return True
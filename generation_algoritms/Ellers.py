@@ -1,8 +1,8 @@
-import random
-from typing import List
-from matplotlib import pyplot as plt, animation
-from matplotlib.animation import Animation
+from typing import BinaryIO, Iterator, Tuple
+
+import numpy as np
 from Maze import Maze, MazeGenerator
+from generation_algoritms.Disjoint_set import DisjointSet
 from settings import Structures
 
 
@@ -10,117 +10,74 @@ class EllersMazeGenerator(MazeGenerator):
     """
     A maze generator algorithm that generates mazes by Eller's algorithm.
     Eller's algorithm works row by row, connecting and merging sets of cells to ensure the maze is fully connected.
-    """
-
-    def __init__(self, maze: Maze) -> None:
-        super().__init__(maze)
-
-    def generate(self) -> None:
-        self.maze.reset()
-        current_row = [0] * self.maze.width
-        next_set = 1
-        sets = {}
-
-        for y in range(self.maze.height):
-            # Assign sets to the current row
-            for x in range(self.maze.width):
-                if current_row[x] == 0:
-                    current_row[x] = next_set
-                    sets[next_set] = [x]
-                    next_set += 1
-
-            # Randomly create horizontal connections
-            for x in range(self.maze.width - 1):
-                if current_row[x] != current_row[x + 1] and random.choice([True, False]):
-                    self.maze.grid[2 * x + 2, 2 * y + 1] = Structures.EMPTY
-                    self._merge_sets(current_row, current_row[x + 1], current_row[x], sets)
-
-            # Create vertical connections for each set
-            if y != self.maze.height - 1:
-                next_row = [0] * self.maze.width
-                vertical_connections = set()
-
-                for s in sets.values():
-                    if len(s) > 0:
-                        x = random.choice(s)
-                        self.maze.grid[2 * x + 1, 2 * y + 2] = Structures.EMPTY
-                        next_row[x] = current_row[x]
-                        vertical_connections.add(current_row[x])
-
-                for x in range(self.maze.width):
-                    if next_row[x] == 0 and random.choice([True, False]):
-                        self.maze.grid[2 * x + 1, 2 * y + 2] = Structures.EMPTY
-                        next_row[x] = current_row[x]
-                        vertical_connections.add(current_row[x])
 
-                current_row = next_row
-                sets = {k: [i for i, v in enumerate(current_row) if v == k] for k in vertical_connections}
-            else:
-                for x in range(self.maze.width - 1):
-                    if current_row[x] != current_row[x + 1]:
-                        self.maze.grid[2 * x + 2, 2 * y + 1] = Structures.EMPTY
-                        self._merge_sets(current_row, current_row[x + 1], current_row[x], sets)
-
-    def _merge_sets(self, row: List[int], set_to_replace: int, replacement_set: int, sets: dict) -> None:
-        for x in range(len(row)):
-            if row[x] == set_to_replace:
-                row[x] = replacement_set
-                sets[replacement_set].append(x)
-        sets[set_to_replace] = []
-
-    def animate(self) -> Animation:
-        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
-        ax.set_xticks([]), ax.set_yticks([])
-        ims = []
-
-        self.maze.reset()
-        current_row = [0] * self.maze.width
-        next_set = 1
-        sets = {}
-
-        for y in range(self.maze.height):
-            for x in range(self.maze.width):
-                if current_row[x] == 0:
-                    current_row[x] = next_set
-                    sets[next_set] = [x]
-                    next_set += 1
-
-            for x in range(self.maze.width - 1):
-                if current_row[x] != current_row[x + 1] and random.choice([True, False]):
-                    self.maze.grid[2 * x + 2, 2 * y + 1] = Structures.EMPTY
-                    self._merge_sets(current_row, current_row[x + 1], current_row[x], sets)
-                    im = ax.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL,
-                                   animated=True)
-                    ims.append([im])
-
-            if y != self.maze.height - 1:
-                next_row = [0] * self.maze.width
-                vertical_connections = set()
-
-                for s in sets.values():
-                    if len(s) > 0:
-                        x = random.choice(s)
-                        self.maze.grid[2 * x + 1, 2 * y + 2] = Structures.EMPTY
-                        next_row[x] = current_row[x]
-                        vertical_connections.add(current_row[x])
-
-                for x in range(self.maze.width):
-                    if next_row[x] == 0 and random.choice([True, False]):
-                        self.maze.grid[2 * x + 1, 2 * y + 2] = Structures.EMPTY
-                        next_row[x] = current_row[x]
-                        vertical_connections.add(current_row[x])
-                        im = ax.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY,
-                                       vmax=Structures.WALL, animated=True)
-                        ims.append([im])
-                current_row = next_row
-                sets = {k: [i for i, v in enumerate(current_row) if v == k] for k in vertical_connections}
-            else:
-                for x in range(self.maze.width - 1):
-                    if current_row[x] != current_row[x + 1]:
-                        self.maze.grid[2 * x + 2, 2 * y + 1] = Structures.EMPTY
-                        self._merge_sets(current_row, current_row[x + 1], current_row[x], sets)
-                        im = ax.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY,
-                                       vmax=Structures.WALL, animated=True)
-                        ims.append([im])
+    Because only the current row is needed, the maze can be streamed row by row with iter_rows() or write_rows(),
+    using memory proportional to the width only. This allows mazes far taller than would fit in memory.
+    """
 
-        return animation.ArtistAnimation(fig, ims, interval=100, blit=True)
+    def __init__(self, maze: Maze, seed=None, rng=None) -> None:
+        super().__init__(maze, seed=seed, rng=rng)
+
+    def iter_rows(self, height: int | None = None) -> Iterator[np.ndarray]:
+        """
+        Generate a maze with Eller's algorithm one row at a time, without ever holding more than one row.
+
+        The sets of the current row live in a disjoint-set forest over its columns. When moving to the next row, the
+        cells that are carried down are joined in a fresh forest, every other cell starts in a set of its own.
+        :param height: The number of rows of the maze, defaults to the height of the maze. It may be larger than the
+        maze, since nothing is written to the maze grid.
+        :return: The 2 * height + 1 rows of the maze grid from top to bottom, as int8 arrays of length 2 * width + 1.
+        """
+        width = self.maze.width
+        height = self.maze.height if height is None else height
+        border = np.full(2 * width + 1, Structures.WALL, dtype=np.int8)
+        yield border.copy()
+
+        sets = DisjointSet(width)
+        for y in range(height):
+            last_row = y == height - 1
+
+            # Randomly create horizontal connections, in the last row connect all different sets
+            cell_row = border.copy()
+            cell_row[1::2] = Structures.EMPTY
+            for x in range(width - 1):
+                if (last_row or self.random.choice([True, False])) and sets.union(x, x + 1):
+                    cell_row[2 * x + 2] = Structures.EMPTY
+            yield cell_row
+
+            wall_row = border.copy()
+            if last_row:
+                yield wall_row
+                return
+
+            # Create vertical connections, at least one for each set
+            members = {}
+            for x in range(width):
+                members.setdefault(sets.find(x), []).append(x)
+            carry_down = self.rng.integers(2, size=width, dtype=np.bool_)
+            next_sets = DisjointSet(width)
+            for columns in members.values():
+                down = [x for x in columns if carry_down[x]] or [self.random.choice(columns)]
+                for x in down:
+                    wall_row[2 * x + 1] = Structures.EMPTY
+                    next_sets.union(down[0], x)
+            sets = next_sets
+            yield wall_row
+
+    def write_rows(self, file: BinaryIO, height: int | None = None) -> None:
+        """
+        Stream a maze generated with Eller's algorithm into a binary file, one grid row at a time.
+        The file receives the raw int8 grid of shape (2 * height + 1, 2 * width + 1) in row-major order.
+        :param file: A file opened for binary writing.
+        :param height: The number of rows of the maze, defaults to the height of the maze.
+        """
+        for row in self.iter_rows(height):
+            file.write(row.tobytes())
+
+    def iter_events(self, batch: bool = False) -> Iterator[Tuple]:
+        """
+        Generate the maze with iter_rows, yielding an event for every row of the grid.
+        :param batch: Not used, the rows are generated one at a time.
+        """
+        for y, row in enumerate(self.iter_rows()):
+            yield self.carve(y, slice(None), row)
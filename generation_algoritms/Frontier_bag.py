@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+
+
+class FrontierBag:
+    """
+    A set of cell ids that supports adding, removing and drawing a uniformly random member in O(1).
+
+    The members are packed at the front of a preallocated array, and a second array maps every cell id to its slot
+    in that array (or -1 if the cell is not a member). Removing a member moves the last member into the freed slot,
+    so the packed part never has holes and a random member is just a random slot.
+    """
+
+    def __init__(self, capacity: int, rng: random.Random = None) -> None:
+        """
+        :param capacity: The number of cell ids (ids go from 0 to capacity - 1).
+        :param rng: The random.Random to draw members with (the global random module if not given).
+        """
+        self.cells = np.empty(capacity, dtype=np.int64)
+        self.position = np.full(capacity, -1, dtype=np.int64)
+        self.size = 0
+        self.randrange = (rng or random).randrange
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, cell: int) -> bool:
+        return self.position[cell] >= 0
+
+    def add(self, cell: int) -> bool:
+        """
+        Add a cell to the bag.
+        :param cell: The id of the cell to add.
+        :return: True if the cell was added, False if it already was a member.
+        """
+        if self.position[cell] >= 0:
+            return False
+        self.cells[self.size] = cell
+        self.position[cell] = self.size
+        self.size += 1
+        return True
+
+    def remove(self, cell: int) -> None:
+        """
+        Remove a member from the bag by swapping the last member into its slot.
+        :param cell: The id of the cell to remove.
+        """
+        slot = self.position[cell]
+        self.size -= 1
+        last = self.cells[self.size]
+        self.cells[slot] = last
+        self.position[last] = slot
+        self.position[cell] = -1
+
+    def pop_random(self) -> int:
+        """
+        Remove a uniformly random member from the bag and return it.
+        :return: The id of the removed cell.
+        """
+        cell = int(self.cells[self.randrange(self.size)])
+        self.remove(cell)
+        return cell
@@ -1,48 +1,126 @@
-import random
+from typing import Iterator, Tuple
 
 import numpy as np
-from matplotlib import pyplot as plt, animation
-from matplotlib.animation import Animation
 from Maze import Maze, MazeGenerator
 from settings import Structures
 
 
 class HuntAndKillMazeGenerator(MazeGenerator):
-    def __init__(self, maze: Maze) -> None:
-        super().__init__(maze)
+    """
+    A maze generator algorithm that generates mazes by the Hunt and Kill algorithm.
+    The Hunt and Kill algorithm works as follows:
+        Pick a random cell and perform a random walk, carving passages to unvisited neighbours, until the current cell
+        has no unvisited neighbours.
+        Hunt: scan the grid row by row for the first unvisited cell next to a visited cell, connect it to that visited
+        cell and continue the random walk from there.
+        Stop when every cell is visited.
+
+    With the hunt cursor enabled, the hunt starts at the first row that still contains unvisited cells instead of at
+    row 0. Rows above it are fully visited and stay so, so the cursor only ever moves down, and per-row counters of
+    unvisited cells let it skip finished rows without scanning them.
+    """
+
+    def __init__(self, maze: Maze, hunt_cursor=True, seed=None, rng=None) -> None:
+        """
+        :param hunt_cursor: Should the hunt resume from the first row with unvisited cells instead of from row 0?
+        """
+        super().__init__(maze, seed=seed, rng=rng)
         self.visited = np.zeros((maze.height, maze.width), dtype=bool)
+        self.hunt_cursor = hunt_cursor
+        self.visited_count = 0
+        self.row_unvisited = np.full(maze.height, maze.width, dtype=np.int64)
+        self.hunt_row = 0
 
-    def generate(self) -> None:
+    def _setup(self):
+        """
+        Reset the maze and the visited bookkeeping, and visit a random first cell.
+        :return: The coordinates of the first cell.
+        """
         self.maze.reset()
-        current_x, current_y = random.randint(0, self.maze.width - 1), random.randint(0, self.maze.height - 1)
-        self.visited[current_x, current_y] = True
-
-        while not np.all(self.visited):
-            neighbors = self.get_unvisited_neighbors(current_x, current_y)
-            if neighbors:
-                next_x, next_y, wall_x, wall_y = random.choice(neighbors)
-                self.maze.grid[2 * next_x + 1, 2 * next_y + 1] = Structures.EMPTY
-                self.maze.grid[wall_x, wall_y] = Structures.EMPTY
-                self.visited[next_x, next_y] = True
-                current_x, current_y = next_x, next_y
-            else:
-                current_x, current_y = self.hunt()
+        self.visited.fill(False)
+        self.visited_count = 0
+        self.row_unvisited.fill(self.maze.width)
+        self.hunt_row = 0
+        current_x, current_y = self.random.randint(0, self.maze.height - 1), self.random.randint(0, self.maze.width - 1)
+        self.visit(current_x, current_y)
+        return current_x, current_y
+
+    def visit(self, x, y):
+        """
+        Mark the cell at (x, y) as visited and update the running counts.
+        """
+        self.visited[x, y] = True
+        self.visited_count += 1
+        self.row_unvisited[x] -= 1
+
+    def walk(self, current_x, current_y):
+        """
+        Take one step of the random walk from the cell at (current_x, current_y), or hunt if it is stuck.
+        :return: The coordinates of the next cell and the event of the step.
+        """
+        neighbors = self.get_unvisited_neighbors(current_x, current_y)
+        if neighbors:
+            next_x, next_y, wall_x, wall_y = self.random.choice(neighbors)
+            self.visit(next_x, next_y)
+            return next_x, next_y, self.carve((wall_x, 2 * next_x + 1), (wall_y, 2 * next_y + 1), Structures.EMPTY)
+        if self.hunt_cursor:
+            return self.hunt_from_cursor()
+        return self.hunt()
+
+    def iter_events(self, batch: bool = False) -> Iterator[Tuple]:
+        """
+        Generate the maze, yielding an event for every cell added to the maze by walking or hunting.
+        :param batch: Not used, the cells are added one at a time.
+        """
+        current_x, current_y = self._setup()
+        total_cells = self.maze.width * self.maze.height
+
+        while self.visited_count < total_cells:
+            current_x, current_y, event = self.walk(current_x, current_y)
+            yield event
+
+    def connect(self, x, y):
+        """
+        Connect the unvisited cell at (x, y) to an adjacent visited cell and mark it visited.
+        :return: The event of the connection.
+        """
+        for nx, ny, wall_x, wall_y in self.get_neighbors(x, y):
+            if self.visited[nx, ny]:
+                self.visit(x, y)
+                return self.carve((wall_x, 2 * x + 1), (wall_y, 2 * y + 1), Structures.EMPTY)
 
     def hunt(self):
-        for y in range(self.maze.height):
-            for x in range(self.maze.width):
+        for x in range(self.maze.height):
+            for y in range(self.maze.width):
                 if not self.visited[x, y] and any(self.visited[nx, ny] for nx, ny, _, _ in self.get_neighbors(x, y)):
                     # Connect the new cell to an adjacent visited cell
-                    connected = False
-                    for nx, ny, wall_x, wall_y in self.get_neighbors(x, y):
-                        if self.visited[nx, ny]:
-                            self.maze.grid[2 * x + 1, 2 * y + 1] = Structures.EMPTY
-                            self.maze.grid[wall_x, wall_y] = Structures.EMPTY
-                            self.visited[x, y] = True
-                            connected = True
-                            break
-                    if connected:
-                        return x, y
+                    return x, y, self.connect(x, y)
+        return None
+
+    def hunt_from_cursor(self):
+        """
+        Hunt for the first unvisited cell next to a visited cell, starting at the first row with unvisited cells.
+        :return: The coordinates of the cell found and the event of its connection.
+        """
+        while self.row_unvisited[self.hunt_row] == 0:
+            self.hunt_row += 1
+
+        for x in range(self.hunt_row, self.maze.height):
+            if self.row_unvisited[x] == 0:
+                continue
+            # Cells in this row with a visited neighbour above, below, to the left or to the right
+            next_to_visited = np.zeros(self.maze.width, dtype=bool)
+            if x > 0:
+                next_to_visited |= self.visited[x - 1]
+            if x < self.maze.height - 1:
+                next_to_visited |= self.visited[x + 1]
+            next_to_visited[1:] |= self.visited[x, :-1]
+            next_to_visited[:-1] |= self.visited[x, 1:]
+
+            candidates = next_to_visited & ~self.visited[x]
+            if candidates.any():
+                y = int(candidates.argmax())
+                return x, y, self.connect(x, y)
         return None
 
     def get_unvisited_neighbors(self, x, y):
@@ -50,7 +128,7 @@ class HuntAndKillMazeGenerator(MazeGenerator):
         neighbors = []
         for dx, dy in directions:
             nx, ny = x + dx, y + dy
-            if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height and not self.visited[nx, ny]:
+            if 0 <= nx < self.maze.height and 0 <= ny < self.maze.width and not self.visited[nx, ny]:
                 neighbors.append((nx, ny, 2 * x + 1 + dx, 2 * y + 1 + dy))
         return neighbors
 
@@ -59,31 +137,6 @@ class HuntAndKillMazeGenerator(MazeGenerator):
         neighbors = []
         for dx, dy in directions:
             nx, ny = x + dx, y + dy
-            if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height:
+            if 0 <= nx < self.maze.height and 0 <= ny < self.maze.width:
                 neighbors.append((nx, ny, 2 * x + 1 + dx, 2 * y + 1 + dy))
         return neighbors
-
-    def animate(self) -> Animation:
-        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
-        ax.set_xticks([]), ax.set_yticks([])
-        ims = []
-
-        self.maze.reset()
-        current_x, current_y = random.randint(0, self.maze.width - 1), random.randint(0, self.maze.height - 1)
-        self.visited[current_x, current_y] = True
-
-        while not np.all(self.visited):
-            neighbors = self.get_unvisited_neighbors(current_x, current_y)
-            if neighbors:
-                next_x, next_y, wall_x, wall_y = random.choice(neighbors)
-                self.maze.grid[2 * next_x + 1, 2 * next_y + 1] = Structures.EMPTY
-                self.maze.grid[wall_x, wall_y] = Structures.EMPTY
-                self.visited[next_x, next_y] = True
-                current_x, current_y = next_x, next_y
-                im = ax.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL,
-                               animated=True)
-                ims.append([im])
-            else:
-                current_x, current_y = self.hunt()
-
-        return animation.ArtistAnimation(fig, ims, interval=100, blit=True)
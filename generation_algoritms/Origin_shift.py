@@ -1,142 +1,175 @@
-import random
-from typing import List, Tuple
+from collections import deque
+from typing import Iterator, List, Tuple
 
 import numpy as np
-from matplotlib import pyplot as plt, animation
-from matplotlib.animation import Animation
 
 from Maze import MazeGenerator
+from generation_algoritms.Random_walk import clipped_cumsum
 from settings import Structures, origin_shift_iterations
 
 
-class Node:
-    def __init__(self):
-        self.direction = None  # This will be a tuple representing the direction (dx, dy)
-
-
 class OriginShiftGenerator(MazeGenerator):
-    def __init__(self, maze):
-        super().__init__(maze)
-        self.grid = [[Node() for _ in range(maze.width)] for _ in range(maze.height)]
+    """
+    A maze generator algorithm that generates mazes by the Origin Shift algorithm.
+
+    The maze is stored as a tree in which every cell points to one neighbour, and all paths lead to the origin cell.
+    On each iteration the origin points to a random neighbour, and that neighbour becomes the new origin and points
+    nowhere. The result is always a perfect maze, and it becomes more random with every iteration.
+
+    The pointers are kept in an int8 array holding an index into directions for every cell, or NO_DIRECTION for the
+    origin. Since a single move only changes one or two walls, iterate_patch() returns those changes, so the events of
+    a move only write those walls.
+    """
+
+    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # (row, column) offsets: Right, Down, Left, Up
+    NO_DIRECTION = -1
+    # Largest number of random moves drawn at once by iterate
+    batch_size = 1 << 16
+
+    def __init__(self, maze, seed=None, rng=None):
+        super().__init__(maze, seed=seed, rng=rng)
+        self.direction = np.full((maze.height, maze.width), self.NO_DIRECTION, dtype=np.int8)
         self.origin = (0, 0)
 
     def initialize_perfect_maze(self):
         """
         Initialize the grid with all horizontal paths connected by one vertical path.
         """
-        # Initialize the visited array
-        self.visited = np.zeros((self.maze.height, self.maze.width), dtype=np.bool_)
-
         # Create horizontal paths
-        for y in range(self.maze.height):
-            for x in range(self.maze.width - 1):
-                self.grid[y][x].direction = (0, 1)
-                self.visited[y][x] = True
+        self.direction[:, :-1] = 0
 
         # Create vertical path connecting horizontal paths
-        for y in range(self.maze.height - 1):
-            self.grid[y][self.maze.width - 1].direction = (1, 0)
-            self.visited[y][self.maze.width - 1] = True
-
-        # Set the last cell in the bottom right to point nowhere and mark it visited
-        self.visited[self.maze.height - 1][self.maze.width - 1] = True
+        self.direction[:-1, -1] = 1
 
-        # Set the origin to be the last cell in the bottom right
+        # Set the last cell in the bottom right to point nowhere and make it the origin
+        self.direction[-1, -1] = self.NO_DIRECTION
         self.origin = (self.maze.height - 1, self.maze.width - 1)
 
-    def get_unvisited_neighbors(self, x: int, y: int) -> List[Tuple[int, int]]:
+    def _iter_moves(self, iterations: int) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
         """
-        Get all unvisited neighbors of the cell at (x, y).
+        Draw the random walk of the origin in batches, dropping the moves off the grid.
+        :param iterations: The number of origin moves to make.
+        :return: An iterator over (directions, rows, columns) arrays: the direction of every move in a batch and the
+        position of the origin after it.
         """
-        neighbors = []
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-        for (dx, dy) in directions:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height and not self.visited[nx][ny]:
-                neighbors.append((nx, ny))
-        return neighbors
+        height, width = self.maze.height, self.maze.width
+        if height * width == 1:
+            return
+        d_rows = np.array([d_row for d_row, _ in self.directions], dtype=np.int8)
+        d_columns = np.array([d_column for _, d_column in self.directions], dtype=np.int8)
+        row, column = self.origin
+
+        while iterations > 0:
+            # At least half of the moves are valid, even in a corner
+            moves = self.rng.integers(len(self.directions), size=min(2 * iterations + 16, self.batch_size))
+            rows = clipped_cumsum(d_rows[moves], row, height - 1)
+            columns = clipped_cumsum(d_columns[moves], column, width - 1)
+            moved = np.flatnonzero(
+                (rows != np.concatenate(([row], rows[:-1]))) | (columns != np.concatenate(([column], columns[:-1])))
+            )[:iterations]
+            if len(moved) == 0:
+                continue
+            yield moves[moved], rows[moved], columns[moved]
+            row, column = int(rows[moved[-1]]), int(columns[moved[-1]])
+            iterations -= len(moved)
+
+    def iterate(self, iterations: int = 1):
+        """
+        Perform the given number of iterations of the algorithm.
 
-    def iterate(self):
+        The origin performs a random walk, so its moves are computed in batches: every cell the origin left ends up
+        pointing in the direction it left that cell for the last time.
+        :param iterations: The number of origin moves to make.
+        """
+        width = self.maze.width
+        direction = self.direction.reshape(-1)
+        for directions, rows, columns in self._iter_moves(iterations):
+            # The cells the origin left, and the direction it left them in, latest move first
+            row, column = self.origin
+            left_rows = np.concatenate(([row], rows[:-1]))[::-1]
+            left_columns = np.concatenate(([column], columns[:-1]))[::-1]
+            left_cells = left_rows.astype(np.int64) * width + left_columns
+            cells, last = np.unique(left_cells, return_index=True)
+            direction[cells] = directions[::-1][last]
+
+            self.origin = (int(rows[-1]), int(columns[-1]))
+            direction[self.origin[0] * width + self.origin[1]] = self.NO_DIRECTION
+
+    def iterate_patch(self, next_row: int, next_column: int) -> List[Tuple[Tuple[int, int], int, int]]:
         """
-        Perform one iteration of the algorithm.
+        Perform one iteration of the algorithm, moving the origin to the given neighbour, and return the changes it
+        makes to the maze grid, without applying them.
+
+        A move only changes two pointers: the origin now points at the chosen neighbour, which stops pointing at its
+        parent. So the wall to the parent of the neighbour closes and the wall between the old and the new origin
+        opens, unless they are the same wall.
+        :return: A list of (grid position, old value, new value) changes.
         """
-        x, y = self.origin
-        neighbors = self.get_neighbors(x, y)
-        if neighbors:
-            nx, ny = random.choice(neighbors)
-            self.grid[x][y].direction = (nx - x, ny - y)
-            self.grid[nx][ny].direction = None
-            self.origin = (nx, ny)
+        row, column = self.origin
+        patch = []
+
+        old_direction = self.direction[next_row, next_column]
+        d_row, d_column = self.directions[old_direction]
+        if (next_row + d_row, next_column + d_column) != (row, column):
+            parent_wall = (2 * next_row + 1 + d_row, 2 * next_column + 1 + d_column)
+            origin_wall = (row + next_row + 1, column + next_column + 1)
+            patch.append((parent_wall, Structures.EMPTY, Structures.WALL))
+            patch.append((origin_wall, Structures.WALL, Structures.EMPTY))
+
+        self.direction[row, column] = self.directions.index((next_row - row, next_column - column))
+        self.direction[next_row, next_column] = self.NO_DIRECTION
+        self.origin = (next_row, next_column)
+        return patch
 
     def get_neighbors(self, x: int, y: int) -> List[Tuple[int, int]]:
         """
         Get all neighbors of the cell at (x, y).
         """
         neighbors = []
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-        for (dx, dy) in directions:
+        for (dx, dy) in self.directions:
             nx, ny = x + dx, y + dy
-            if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height:
+            if 0 <= nx < self.maze.height and 0 <= ny < self.maze.width:
                 neighbors.append((nx, ny))
         return neighbors
 
-    def generate(self, iterations: int = origin_shift_iterations) -> None:
+    def iter_events(self, iterations: int = origin_shift_iterations, batch: bool = False) -> Iterator[Tuple]:
         """
-        Generate the maze with the given number of iterations.
+        Generate the maze with the given number of iterations, yielding an event for every move that changes walls.
+        :param batch: Should all moves be made at once, yielding a single event with the whole grid?
         """
         self.initialize_perfect_maze()
-        for _ in range(iterations):
-            self.iterate()
         self.update_maze_grid()
+        if batch:
+            self.iterate(iterations)
+            self.update_maze_grid()
+            yield slice(None), slice(None), self.maze.grid
+            return
 
-    def update_maze_grid(self):
-        """
-        Update the maze grid based on the node directions.
-        """
-        self.maze.reset()
-        for x in range(self.maze.width):
-            for y in range(self.maze.height):
-                if self.grid[x][y].direction is not None:
-                    dx, dy = self.grid[x][y].direction
-                    nx, ny = x + dx, y + dy
-                    self.maze.grid[2 * x + 1, 2 * y + 1] = Structures.EMPTY
-                    self.maze.grid[2 * nx + 1, 2 * ny + 1] = Structures.EMPTY
-                    self.maze.grid[2 * x + 1 + dx, 2 * y + 1 + dy] = Structures.EMPTY
+        for _, rows, columns in self._iter_moves(iterations):
+            for next_row, next_column in zip(rows.tolist(), columns.tolist()):
+                patch = self.iterate_patch(next_row, next_column)
+                if patch:
+                    positions, _, values = zip(*patch)
+                    yield self.carve(*zip(*positions), values)
 
-    def animate(self, iterations: int = origin_shift_iterations) -> Animation:
+    def generate(self, iterations: int = origin_shift_iterations) -> None:
         """
-        Generate an animation of the maze generation.
-        :return: The animation of the maze generation.
+        Generate the maze with the given number of iterations.
         """
-        # Adjust figure size based on maze dimensions
-        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
-        ax.set_xticks([]), ax.set_yticks([])
+        deque(self.iter_events(iterations, batch=True), maxlen=0)
 
-        ims = []
-
-        self.initialize_perfect_maze()
+    def update_maze_grid(self):
+        """
+        Update the maze grid based on the cell directions, in one vectorized pass.
 
-        # Create the image for the initial grid
-        im = ax.imshow(
-            self.maze.grid.copy(),
-            cmap='binary',
-            vmin=Structures.EMPTY,
-            vmax=Structures.WALL,
-            animated=True
-        )
-        ims.append([im])
-
-        # Iteratively update the grid and capture each step
-        for _ in range(iterations):
-            self.iterate()
-            self.update_maze_grid()
-            im = ax.imshow(
-                self.maze.grid.copy(),
-                cmap='binary',
-                vmin=Structures.EMPTY,
-                vmax=Structures.WALL,
-                animated=True
-            )
-            ims.append([im])
-
-        return animation.ArtistAnimation(fig, ims, interval=100, blit=True)
+        The wall between two neighbouring cells is open when either of them points at the other.
+        """
+        self.maze.invalidate_adjacency()
+        grid = self.maze.grid
+        direction = self.direction
+        east_open = (direction[:, :-1] == 0) | (direction[:, 1:] == 2)
+        south_open = (direction[:-1, :] == 1) | (direction[1:, :] == 3)
+
+        grid[1::2, 1::2] = Structures.EMPTY
+        grid[1::2, 2:-1:2] = np.where(east_open, np.int8(Structures.EMPTY), np.int8(Structures.WALL))
+        grid[2:-1:2, 1::2] = np.where(south_open, np.int8(Structures.EMPTY), np.int8(Structures.WALL))
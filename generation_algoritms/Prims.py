@@ -1,11 +1,9 @@
-import random
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 import numpy as np
-from matplotlib import pyplot as plt, animation
-from matplotlib.animation import Animation
 
 from Maze import MazeGenerator
+from generation_algoritms.Frontier_bag import FrontierBag
 from settings import Structures
 
 
@@ -15,109 +13,89 @@ class PrimsMazeGenerator(MazeGenerator):
 
     The algorithm works as follows:
     1. Start with a grid full of walls.
-    2. Choose a random cell, mark it as part of the maze. Add the walls of the cell to the wall list.
-    3. While there are walls in the list:
-       a. Pick a random wall from the list.
-       b. If the cell on the opposite side isn't in the maze yet:
-          i. Make the wall a passage and mark the cell on the opposite side as part of the maze.
-          ii. Add the neighboring walls of the cell to the wall list.
-       c. Remove the wall from the list.
+    2. Choose a random cell, mark it as part of the maze. Add the neighbors of the cell to the frontier.
+    3. While there are cells in the frontier:
+       a. Remove a random cell from the frontier.
+       b. Make the wall between it and a random neighbor that is already part of the maze a passage.
+       c. Mark the cell as part of the maze and add its neighbors that aren't in the maze yet to the frontier.
+
+    The frontier is a FrontierBag: every cell is in it at most once, and a random cell is removed in constant time.
 
     This process ensures that the maze is fully connected and each cell is reachable from any other cell.
     """
 
-    def __init__(self, maze):
-        super().__init__(maze)
+    def __init__(self, maze, seed=None, rng=None):
+        super().__init__(maze, seed=seed, rng=rng)
         self.visited = np.zeros((maze.height, maze.width), dtype=np.bool_)
-        self.walls = []
+        self.frontier = FrontierBag(maze.width * maze.height, self.random)
 
-    def get_neighbors(self, x: int, y: int) -> List[Tuple[int, int, int, int]]:
+    def get_neighbors(self, cell: int) -> List[int]:
         """
-        Get all neighbors and walls for the cell at (x, y).
+        Get the ids of all cells next to the cell with the given id.
 
         Returns:
         --------
-        neighbors : list of tuple
-            A list of tuples representing the coordinates of neighboring cells and the walls.
+        neighbors : list of int
+            A list with the ids (row * width + column) of the neighboring cells.
         """
+        width = self.maze.width
+        row, column = divmod(cell, width)
         neighbors = []
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-        for (dx, dy) in directions:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height and not self.visited[nx, ny]:
-                neighbors.append((nx, ny, dx, dy))
+        if column < width - 1:
+            neighbors.append(cell + 1)
+        if row < self.maze.height - 1:
+            neighbors.append(cell + width)
+        if column > 0:
+            neighbors.append(cell - 1)
+        if row > 0:
+            neighbors.append(cell - width)
         return neighbors
 
-    def generate(self) -> None:
+    def _add_to_maze(self, cell: int, previous: int | None = None) -> Tuple:
         """
-        Generates a maze using Prim's algorithm.
+        Mark a cell as part of the maze, open the wall to the given maze cell and add its neighbors to the frontier.
+        :return: The event of the added cell.
         """
-        self.maze.reset()
-
-        # Start with a random cell
-        start_x, start_y = random.randint(0, self.maze.width - 1), random.randint(0, self.maze.height - 1)
-        self.visited[start_x, start_y] = True
-        self.maze.grid[2 * start_x + 1, 2 * start_y + 1] = Structures.SELECTED  # Start cell
-        self.walls.extend(self.get_neighbors(start_x, start_y))
-
-        while self.walls:
-            rand_wall = random.choice(self.walls)
-            x, y, wx, wy = rand_wall
-            if not self.visited[x, y]:
-                self.visited[x, y] = True
-                self.maze.grid[2 * x + 1 - wx, 2 * y + 1 - wy] = Structures.SELECTED  # Remove the wall
-                self.maze.grid[2 * x + 1, 2 * y + 1] = Structures.SELECTED  # Mark the cell as part of the maze
-
-                # Add the neighboring walls of the cell to the wall list
-                self.walls.extend(self.get_neighbors(x, y))
-
-            self.walls.remove(rand_wall)
+        width = self.maze.width
+        visited = self.visited.reshape(-1)
+        visited[cell] = True
+        row, column = divmod(cell, width)
+        if previous is None:
+            event = self.carve(2 * row + 1, 2 * column + 1, Structures.SELECTED)  # Mark the cell as part of the maze
+        else:
+            # Remove the wall and mark the cell as part of the maze
+            previous_row, previous_column = divmod(previous, width)
+            event = self.carve(
+                (row + previous_row + 1, 2 * row + 1), (column + previous_column + 1, 2 * column + 1), Structures.SELECTED
+            )
+
+        # Add the neighboring cells to the frontier, the bag ignores cells that are already in it
+        for neighbor in self.get_neighbors(cell):
+            if not visited[neighbor]:
+                self.frontier.add(neighbor)
+        return event
+
+    def _grow(self) -> Tuple:
+        """
+        Take a random frontier cell and connect it to a random neighbor that is already part of the maze.
+        :return: The event of the added cell.
+        """
+        visited = self.visited.reshape(-1)
+        cell = self.frontier.pop_random()
+        previous = self.random.choice([neighbor for neighbor in self.get_neighbors(cell) if visited[neighbor]])
+        return self._add_to_maze(cell, previous)
 
-    def animate(self) -> Animation:
+    def iter_events(self, batch: bool = False) -> Iterator[Tuple]:
         """
-        Generate an animation of the maze generation.
-        :return: The animation of the maze generation.
+        Generates a maze using Prim's algorithm, yielding an event for every cell added to the maze.
+        :param batch: Not used, the cells are added one at a time.
         """
-        # Adjust figure size based on maze dimensions
-        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
-        ax.set_xticks([]), ax.set_yticks([])
+        self.maze.reset()
+        self.visited.fill(False)
+        self.frontier = FrontierBag(self.maze.width * self.maze.height, self.random)
 
-        ims = []
+        # Start with a random cell
+        yield self._add_to_maze(self.random.randrange(self.maze.width * self.maze.height))
 
-        self.maze.reset()
-        start_x, start_y = random.randint(0, self.maze.width - 1), random.randint(0, self.maze.height - 1)
-        self.visited[start_x, start_y] = True
-        self.maze.grid[2 * start_x + 1, 2 * start_y + 1] = Structures.SELECTED  # Start cell
-        self.walls.extend(self.get_neighbors(start_x, start_y))
-
-        # Calculate marker size based on maze dimensions
-        base_size = 10
-        marker_size = base_size * min(1, base_size / max(self.maze.width, self.maze.height))
-
-        while self.walls:
-            rand_wall = random.choice(self.walls)
-            x, y, wx, wy = rand_wall
-            if not self.visited[x, y]:
-                self.visited[x, y] = True
-                self.maze.grid[2 * x + 1 - wx, 2 * y + 1 - wy] = Structures.SELECTED  # Remove the wall
-                self.maze.grid[2 * x + 1, 2 * y + 1] = Structures.SELECTED   # Mark the cell as part of the maze
-
-                # Create the image for the current frame
-                im = ax.imshow(
-                    self.maze.grid.copy(),
-                    cmap='binary',
-                    vmin=Structures.EMPTY,
-                    vmax=Structures.WALL,
-                    animated=True
-                )
-                red_dot, = ax.plot(2*y+1, 2*x+1, marker='o', color='red', markersize=marker_size, animated=True)
-
-                # Append the image and the current cell marker to the frame
-                ims.append([im, red_dot])
-
-                # Add the neighboring walls of the cell to the wall list
-                self.walls.extend(self.get_neighbors(x, y))
-
-            self.walls.remove(rand_wall)
-
-        return animation.ArtistAnimation(fig, ims, interval=100, blit=True)
+        while self.frontier:
+            yield self._grow()
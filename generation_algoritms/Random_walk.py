@@ -0,0 +1,36 @@
+import numpy as np
+
+
+def clipped_cumsum(steps: np.ndarray, start: int, upper: int) -> np.ndarray:
+    """
+    Compute the positions of a walk along one axis that starts at start, takes the given steps and stays put
+    whenever a step would leave the range [0, upper].
+
+    Up to the first step that would leave the range this is a plain cumulative sum. From there on, every step is
+    the function x -> min(max(x + shift, low), high), and compositions of such functions have the same form, so
+    the prefix compositions are combined with a parallel (Hillis-Steele) scan in log2(len(steps)) passes.
+    :param steps: The steps along the axis (-1, 0 or 1).
+    :param start: The position before the first step.
+    :param upper: The largest valid position.
+    :return: The position after every step.
+    """
+    positions = start + np.cumsum(steps, dtype=np.int32)
+    outside = (positions < 0) | (positions > upper)
+    if not outside.any():
+        return positions
+
+    first = outside.argmax()
+    if first > 0:
+        start = positions[first - 1]
+    shift = steps[first:].astype(np.int32)
+    low = np.zeros_like(shift)
+    high = np.full_like(shift, upper)
+    offset = 1
+    while offset < len(shift):
+        new_shift = shift[:-offset] + shift[offset:]
+        new_low = np.maximum(low[:-offset] + shift[offset:], low[offset:])
+        new_high = np.minimum(np.maximum(high[:-offset] + shift[offset:], low[offset:]), high[offset:])
+        shift[offset:], low[offset:], high[offset:] = new_shift, new_low, new_high
+        offset *= 2
+    positions[first:] = np.minimum(np.maximum(start + shift, low), high)
+    return positions
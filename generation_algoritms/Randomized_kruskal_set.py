@@ -1,11 +1,9 @@
-import random
-from typing import List, Tuple
+from typing import Iterator, Tuple
 
 import numpy as np
-from matplotlib import pyplot as plt, animation
-from matplotlib.animation import Animation
 
 from Maze import MazeGenerator
+from generation_algoritms.Disjoint_set import DisjointSet
 from settings import Structures
 
 
@@ -21,118 +19,78 @@ class RandomizedKruskalSetMazeGenerator(MazeGenerator):
              Join the sets of the formerly divided cells.
 
     This process ensures that the maze is fully connected and each cell is reachable from any other cell.
+
+    The sets are kept in a disjoint-set forest indexed by cell id (row * width + column), so checking and joining
+    two sets is nearly constant time and generation scales linearly with the number of cells.
     """
 
-    def __init__(self, maze):
-        super().__init__(maze)
-        self.sets = [set([(x, y)]) for x in range(maze.width) for y in range(maze.height)]
+    # Number of walls converted to Python ints at a time while walking the shuffled wall list
+    chunk_size = 1 << 16
+
+    def __init__(self, maze, seed=None, rng=None):
+        super().__init__(maze, seed=seed, rng=rng)
+        self.sets = DisjointSet(maze.width * maze.height)
         self.walls = self._initialize_walls()
 
-    def _initialize_walls(self) -> List[Tuple[int, int, int, int]]:
+    def _initialize_walls(self) -> np.ndarray:
         """
-        Initialize all the walls in the maze.
+        Initialize all the walls in the maze, in a random order.
+        :return: An array of shape (n, 2) holding the ids of the two cells separated by each wall.
         """
-        walls = []
-        for x in range(self.maze.width):
-            for y in range(self.maze.height):
-                if x < self.maze.width - 1:
-                    walls.append((x, y, x + 1, y))  # Vertical wall
-                if y < self.maze.height - 1:
-                    walls.append((x, y, x, y + 1))  # Horizontal wall
-        random.shuffle(walls)
-        return walls
-
-    def find_set(self, cell: Tuple[int, int]) -> set | None:
+        width, height = self.maze.width, self.maze.height
+        cells = np.arange(width * height, dtype=np.int64).reshape(height, width)
+        east_walls = np.stack((cells[:, :-1].ravel(), cells[:, 1:].ravel()), axis=1)  # Vertical walls
+        south_walls = np.stack((cells[:-1, :].ravel(), cells[1:, :].ravel()), axis=1)  # Horizontal walls
+        walls = np.concatenate((east_walls, south_walls))
+        return walls[self.rng.permutation(len(walls))]
+
+    def find_set(self, cell: int) -> int:
         """
-        Find the set that contains the given cell.
+        Find the representative of the set that contains the given cell.
         """
-        for s in self.sets:
-            if cell in s:
-                return s
-        return None
+        return self.sets.find(cell)
 
-    def generate(self) -> None:
+    def _cell_position(self, cell: int) -> tuple[int, int]:
         """
-        Generates a maze using the iterative randomized Kruskal's algorithm.
+        Get the position in the maze grid of the cell with the given id.
         """
-        self.maze.reset()
-
-        while self.walls:
-            x1, y1, x2, y2 = self.walls.pop()
-            set1 = self.find_set((x1, y1))
-            set2 = self.find_set((x2, y2))
+        row, column = divmod(cell, self.maze.width)
+        return 2 * row + 1, 2 * column + 1
 
-            if set1 != set2:
-                fx = 2 * x1 + 1
-                fy = 2 * y1 + 1
-                sx = 2 * x2 + 1
-                sy = 2 * y2 + 1
-                # Remove the wall between the cells
-                wall_x = (fx + sx) // 2
-                wall_y = (fy + sy) // 2
-                self.maze.grid[wall_x, wall_y] = Structures.SELECTED
-                self.maze.grid[fx, fy] = Structures.SELECTED
-                self.maze.grid[sx, sy] = Structures.SELECTED
-
-                # Merge the sets
-                self.sets.remove(set1)
-                set1.update(set2)
-                self.sets.append(set1)
-                self.sets.remove(set2)
-
-    def animate(self) -> Animation:
+    def _carve(self, walls: np.ndarray) -> Tuple:
         """
-        Generate an animation of the maze generation.
-        :return: The animation of the maze generation.
+        Remove the given walls, and open the cells on both sides of them, in one vectorized write.
+        :param walls: An array of shape (n, 2) with the cell ids on both sides of every wall to remove.
+        :return: The event of the write.
+        """
+        rows, columns = np.divmod(walls, self.maze.width)
+        return self.carve(
+            np.concatenate((rows.sum(axis=1) + 1, 2 * rows.ravel() + 1)),
+            np.concatenate((columns.sum(axis=1) + 1, 2 * columns.ravel() + 1)),
+            Structures.SELECTED
+        )
+
+    def iter_events(self, batch: bool = False) -> Iterator[Tuple]:
+        """
+        Generates a maze using the iterative randomized Kruskal's algorithm, yielding an event for every removed wall.
+        :param batch: Should the walls removed from a whole chunk of the wall list be yielded as one event?
         """
-        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
-        ax.set_xticks([]), ax.set_yticks([])
-
-        ims = []
-
         self.maze.reset()
-        walls = self._initialize_walls()
-        self.sets = [set([(x, y)]) for x in range(self.maze.width) for y in range(self.maze.height)]
-
-        # Calculate marker size based on maze dimensions
-        base_size = 10
-        marker_size = base_size * min(1, base_size / max(self.maze.width, self.maze.height))
-
-        while walls:
-            x1, y1, x2, y2 = walls.pop()
-            set1 = self.find_set((x1, y1))
-            set2 = self.find_set((x2, y2))
-
-            if set1 != set2:
-                fx = 2 * x1 + 1
-                fy = 2 * y1 + 1
-                sx = 2 * x2 + 1
-                sy = 2 * y2 + 1
-                # Remove the wall between the cells
-                wall_x = (fx + sx)//2
-                wall_y = (fy + sy)//2
-                self.maze.grid[wall_x, wall_y] = Structures.SELECTED
-                self.maze.grid[fx, fy] = Structures.SELECTED
-                self.maze.grid[sx, sy] = Structures.SELECTED
-
-                # Merge the sets
-                self.sets.remove(set1)
-                set1.update(set2)
-                self.sets.append(set1)
-                self.sets.remove(set2)
-
-                # Create the image for the current frame
-                im = ax.imshow(
-                    self.maze.grid.copy(),
-                    cmap='binary',
-                    vmin=Structures.EMPTY,
-                    vmax=Structures.WALL,
-                    animated=True
-                )
-                red_dot1, = ax.plot(fy, fx, marker='o', color='red', markersize=marker_size, animated=True)
-                red_dot2, = ax.plot(sy, sx, marker='o', color='red', markersize=marker_size, animated=True)
-
-                # Append the image and the current cell marker to the frame
-                ims.append([im, red_dot1, red_dot2])
-
-        return animation.ArtistAnimation(fig, ims, interval=100, blit=True)
+        self.sets = DisjointSet(self.maze.width * self.maze.height)
+        remaining_joins = self.maze.width * self.maze.height - 1
+
+        for offset in range(0, len(self.walls), self.chunk_size):
+            if remaining_joins == 0:
+                break
+            removed = []
+            for i, (first, second) in enumerate(self.walls[offset:offset + self.chunk_size].tolist(), offset):
+                if self.sets.union(first, second):
+                    if batch:
+                        removed.append(i)
+                    else:
+                        yield self._carve(self.walls[i:i + 1])
+                    remaining_joins -= 1
+                    if remaining_joins == 0:
+                        break
+            if removed:
+                yield self._carve(self.walls[removed])
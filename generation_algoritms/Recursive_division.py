@@ -1,6 +1,6 @@
-import random
-from matplotlib import pyplot as plt
-from matplotlib.animation import ArtistAnimation
+from typing import Iterator, Tuple
+
+import numpy as np
 from Maze import MazeGenerator
 from settings import Structures
 
@@ -21,155 +21,71 @@ class RecursiveDivisionMazeGenerator(MazeGenerator):
     until every chamber has a width of one cell in either of the two directions.
     """
 
-    def __init__(self, maze):
-        super().__init__(maze)
-
-    def divide(self, x: int, y: int, width: int, height: int, orientation: str) -> None:
+    def __init__(self, maze, min_chamber_size=1, seed=None, rng=None):
         """
-        Recursively divide the space into smaller chambers.
+        :param min_chamber_size: Chambers with a width or height of at most this many cells are not divided any
+        further. Chambers larger than a corridor are then carved in bulk as a binary tree maze instead.
         """
-        if width <= 1 or height <= 1:
-            return
-
-        if orientation == 'H':
-            wallx = x
-            wall_index = random.randint(1, height - 1)
-            wally = y + wall_index
-            passagex = wallx + random.randint(0, width - 1)
-            passagey = wally
-            dx = 1
-            dy = 0
-            length = width
-            next_orientation = 'V'
-        else:
-            wall_index = random.randint(1, width - 1)
-            wallx = x + wall_index
-            wally = y
-            passagex = wallx
-            passagey = wally + random.randint(0, height - 1)
-            dx = 0
-            dy = 1
-            length = height
-            next_orientation = 'H'
-
-        for i in range(length):
-            nextx = wallx + i * dx
-            nexty = wally + i * dy
-
-            if orientation == 'V':
-                self.maze.grid[2 * nextx, 2 * nexty + 1] = Structures.WALL  # Set wall in the gray space
-            else:
-                self.maze.grid[2 * nextx + 1, 2 * nexty] = Structures.WALL  # Set wall in the gray space
-
-            if (nextx, nexty) != (passagex, passagey):
-                self.maze.grid[2 * nextx, 2 * nexty] = Structures.WALL  # Set wall in the gray space
-
-        self.maze.grid[2 * passagex, 2 * passagey] = Structures.WALL
+        super().__init__(maze, seed=seed, rng=rng)
+        self.min_chamber_size = min_chamber_size
 
-        if orientation == 'H':
-            self.maze.grid[2 * passagex + 1, 2 * passagey] = Structures.SELECTED
-        else:
-            self.maze.grid[2 * passagex, 2 * passagey + 1] = Structures.SELECTED
-
-        if orientation == 'H':
-            self.divide(x, y + wall_index, width, height - wall_index, next_orientation)
-            self.divide(x, y, width, wall_index, next_orientation)
-        else:
-            self.divide(x + wall_index, y, width - wall_index, height, next_orientation)
-            self.divide(x, y, wall_index, height, next_orientation)
-
-    def generate(self) -> None:
+    def carve_chamber(self, top: int, left: int, height: int, width: int) -> Tuple:
         """
-        Generates a maze using the Recursive Division algorithm.
+        Turn an undivided chamber into a perfect maze in one vectorized pass: close all its inner walls, then let every
+        cell open the wall above it or to its left (binary tree).
+        :return: The event of the carved chamber.
         """
-        self.maze.grid.fill(Structures.SELECTED)  # Set all cells to paths
-        self.maze.grid[0, :] = Structures.WALL  # Top boundary
-        self.maze.grid[:, 0] = Structures.WALL  # Left boundary
-        self.maze.grid[-1, :] = Structures.WALL  # Bottom boundary
-        self.maze.grid[:, -1] = Structures.WALL  # Right boundary
-
-        self.divide(0, 0, self.maze.width, self.maze.height, 'H')
-
-    def animate(self) -> ArtistAnimation:
+        self.maze.invalidate_adjacency()
+        rows, columns = slice(2 * top, 2 * (top + height) + 1), slice(2 * left, 2 * (left + width) + 1)
+        chamber = self.maze.grid[rows, columns]
+        chamber[2:-1:2, 1:-1] = Structures.WALL
+        chamber[1:-1, 2:-1:2] = Structures.WALL
+
+        up = self.rng.integers(2, size=(height, width), dtype=np.bool_)
+        up[:, 0] = True
+        up[0, :] = False
+        chamber[2:-1:2, 1::2] = np.where(up[1:], np.int8(Structures.SELECTED), np.int8(Structures.WALL))
+        chamber[1::2, 2:-1:2] = np.where(up[:, 1:], np.int8(Structures.WALL), np.int8(Structures.SELECTED))
+        return rows, columns, chamber
+
+    def iter_events(self, batch: bool = False) -> Iterator[Tuple]:
         """
-        Generate an animation of the maze generation.
-        :return: The animation of the maze generation.
-        """
-        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
-        ax.set_xticks([]), ax.set_yticks([])
-
-        ims = []
-
-        self.maze.grid.fill(Structures.SELECTED)  # Set all cells to paths
-        self.maze.grid[0, :] = Structures.WALL  # Top boundary
-        self.maze.grid[:, 0] = Structures.WALL  # Left boundary
-        self.maze.grid[-1, :] = Structures.WALL  # Bottom boundary
-        self.maze.grid[:, -1] = Structures.WALL  # Right boundary
-        steps = [(0, 0, self.maze.width, self.maze.height, 'H')]
+        Generates a maze using the Recursive Division algorithm, yielding an event for every dividing wall.
 
-        base_size = 10
-        marker_size = base_size * min(1, base_size / max(self.maze.width, self.maze.height))
-
-        while steps:
-            x, y, width, height, orientation = steps.pop()
-            if width <= 1 or height <= 1:
+        The chambers still to divide are kept on an explicit stack, and every dividing wall is drawn with a single
+        slice assignment. Chambers are given as (top row, left column, height, width, orientation) in cells, where
+        'H' chambers are split by a wall along a grid column and 'V' chambers by a wall along a grid row.
+        :param batch: Not used, every wall is a single write already.
+        """
+        self.maze.invalidate_adjacency()
+        grid = self.maze.grid
+        grid.fill(Structures.SELECTED)  # Set all cells to paths
+        grid[0, :] = Structures.WALL  # Top boundary
+        grid[:, 0] = Structures.WALL  # Left boundary
+        grid[-1, :] = Structures.WALL  # Bottom boundary
+        grid[:, -1] = Structures.WALL  # Right boundary
+
+        chambers = [(0, 0, self.maze.height, self.maze.width, 'H')]
+        while chambers:
+            top, left, height, width, orientation = chambers.pop()
+            if width <= self.min_chamber_size or height <= self.min_chamber_size:
+                if width > 1 and height > 1:
+                    yield self.carve_chamber(top, left, height, width)
                 continue
 
             if orientation == 'H':
-                wallx = x
-                wall_index = random.randint(1, height - 1)
-                wally = y + wall_index
-                passagex = wallx + random.randint(0, width - 1)
-                passagey = wally
-                dx = 1
-                dy = 0
-                length = width
-                next_orientation = 'V'
-            else:
-                wall_index = random.randint(1, width - 1)
-                wallx = x + wall_index
-                wally = y
-                passagex = wallx
-                passagey = wally + random.randint(0, height - 1)
-                dx = 0
-                dy = 1
-                length = height
-                next_orientation = 'H'
-
-            for i in range(length):
-                nextx = wallx + i * dx
-                nexty = wally + i * dy
-
-                if orientation == 'V':
-                    self.maze.grid[2 * nextx, 2 * nexty + 1] = Structures.WALL  # Set wall in the gray space
-                else:
-                    self.maze.grid[2 * nextx + 1, 2 * nexty] = Structures.WALL  # Set wall in the gray space
-
-                if (nextx, nexty) != (passagex, passagey):
-                    self.maze.grid[2 * nextx, 2 * nexty] = Structures.WALL  # Set wall in the gray space
-
-            self.maze.grid[2 * passagex, 2 * passagey] = Structures.WALL
-
-            if orientation == 'H':
-                self.maze.grid[2 * passagex + 1, 2 * passagey] = Structures.SELECTED
+                wall_index = self.random.randint(1, width - 1)
+                passage = self.random.randint(0, height - 1)
+                wall = np.full(2 * height + 1, Structures.WALL, dtype=np.int8)
+                wall[2 * passage + 1] = Structures.SELECTED
+                yield self.carve(slice(2 * top, 2 * (top + height) + 1), 2 * (left + wall_index), wall)
+                chambers.append((top, left + wall_index, height, width - wall_index, 'V'))
+                chambers.append((top, left, height, wall_index, 'V'))
             else:
-                self.maze.grid[2 * passagex, 2 * passagey + 1] = Structures.SELECTED
-
-            im = ax.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL, animated=True)
-            red_dot, = ax.plot(
-                2 * passagey + 1, 2 * passagex + 1,
-                marker='o',
-                color='red',
-                markersize=marker_size,
-                animated=True
-            )
-            ims.append([im, red_dot])
-
-            if orientation == 'H':
-                steps.append((x, y + wall_index, width, height-wall_index, next_orientation))
-                steps.append((x, y, width, wall_index, next_orientation))
-            else:
-                steps.append((x + wall_index, y, width-wall_index, height, next_orientation))
-                steps.append((x, y, wall_index, height, next_orientation))
-
-        return ArtistAnimation(fig, ims, interval=100, blit=True)
+                wall_index = self.random.randint(1, height - 1)
+                passage = self.random.randint(0, width - 1)
+                wall = np.full(2 * width + 1, Structures.WALL, dtype=np.int8)
+                wall[2 * passage + 1] = Structures.SELECTED
+                yield self.carve(2 * (top + wall_index), slice(2 * left, 2 * (left + width) + 1), wall)
+                chambers.append((top + wall_index, left, height - wall_index, width, 'H'))
+                chambers.append((top, left, wall_index, width, 'H'))
@@ -1,7 +1,6 @@
-import random
+from typing import Iterator, Tuple
 
-from matplotlib import pyplot as plt, animation
-from matplotlib.animation import Animation
+import numpy as np
 
 from Maze import Maze, MazeGenerator
 from settings import Structures
@@ -18,79 +17,76 @@ class SidewinderMazeGenerator(MazeGenerator):
         Move to the next row and repeat until the maze is complete.
 
     This process ensures that the maze is fully connected and each cell is reachable from any other cell.
-    """
-
-    def __init__(self, maze: Maze) -> None:
-        super().__init__(maze)
 
-    def generate(self) -> None:
-        """
-        Generates a maze with the Sidewinder algorithm.
-        """
-        self.maze.reset()
+    Every row only depends on its own coin flips, so whole blocks of rows are drawn and carved with NumPy.
+    """
 
-        for y in range(self.maze.height):
-            run = []
-            for x in range(self.maze.width):
-                run.append((x, y))
+    # Number of cells carved per vectorized block of rows
+    block_cells = 1 << 16
 
-                at_eastern_boundary = (x == self.maze.width - 1)
-                at_northern_boundary = (y == 0)
-                should_close_out = at_eastern_boundary or (not at_northern_boundary and random.choice([True, False]))
+    def __init__(self, maze: Maze, seed=None, rng=None) -> None:
+        super().__init__(maze, seed=seed, rng=rng)
 
-                if should_close_out:
-                    member_x, member_y = random.choice(run)
-                    if member_y > 0:
-                        self.maze.grid[2 * member_x + 1, 2 * member_y] = Structures.EMPTY  # carve north
-                    run = []
-                else:
-                    self.maze.grid[2 * x + 2, 2 * y + 1] = Structures.EMPTY  # carve east
+    def draw_rows(self, first_row: int, last_row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draw the decisions of the rows first_row up to (not including) last_row, all at once.
 
-    def animate(self) -> Animation:
+        Since the last cell of every row closes out its run, runs never cross rows, so in the flattened block every
+        run starts right after the previous close-out. A random member of each run then follows from the run start and
+        length without any per-cell loop.
+        :return: Two (rows, width) boolean arrays: the cells that close out their run, and the cells that carve north.
         """
-        Generate an animation of the maze generation.
-        :return: The animation of the maze generation.
+        width = self.maze.width
+        rows = last_row - first_row
+
+        close_out = self.rng.integers(2, size=(rows, width), dtype=np.bool_)
+        close_out[:, -1] = True  # at eastern boundary
+        if first_row == 0:
+            close_out[0, :-1] = False  # at northern boundary
+
+        run_ends = np.flatnonzero(close_out)
+        run_starts = np.empty_like(run_ends)
+        run_starts[0] = 0
+        run_starts[1:] = run_ends[:-1] + 1
+        members = run_starts + (self.rng.random(len(run_ends)) * (run_ends - run_starts + 1)).astype(np.int64)
+
+        carve_north = np.zeros((rows, width), dtype=np.bool_)
+        carve_north.reshape(-1)[members] = True
+        if first_row == 0:
+            carve_north[0, :] = False
+        return close_out, carve_north
+
+    def carve_rows(self, first_row: int, last_row: int, close_out: np.ndarray, carve_north: np.ndarray) -> Tuple:
+        """
+        Carve the rows first_row up to (not including) last_row with slice assignments.
+        :param close_out: The cells of the rows that close out their run (see draw_rows).
+        :param carve_north: The cells of the rows that carve north (see draw_rows).
+        :return: The event of the carved rows.
+        """
+        self.maze.invalidate_adjacency()
+        grid = self.maze.grid
+        grid[2 * first_row + 1:2 * last_row:2, 2:-1:2] = np.where(
+            close_out[:, :-1], np.int8(Structures.WALL), np.int8(Structures.EMPTY)
+        )  # carve east
+        grid[2 * first_row:2 * last_row:2, 1::2] = np.where(
+            carve_north, np.int8(Structures.EMPTY), np.int8(Structures.WALL)
+        )  # carve north
+        return slice(2 * first_row, 2 * last_row), slice(None), grid[2 * first_row:2 * last_row]
+
+    def iter_events(self, batch: bool = False) -> Iterator[Tuple]:
+        """
+        Generates a maze with the Sidewinder algorithm, yielding an event for every row of cells.
+        :param batch: Should a whole block of rows be yielded as one event?
         """
-        # Adjust figure size based on maze dimensions
-        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
-        ax.set_xticks([]), ax.set_yticks([])
-
-        ims = []
-
         self.maze.reset()
 
-        for y in range(self.maze.height):
-            run = []
-            for x in range(self.maze.width):
-                run.append((x, y))
-
-                at_eastern_boundary = (x == self.maze.width - 1)
-                at_northern_boundary = (y == 0)
-                should_close_out = at_eastern_boundary or (not at_northern_boundary and random.choice([True, False]))
-
-                if should_close_out:
-                    member_x, member_y = random.choice(run)
-                    if member_y > 0:
-                        self.maze.grid[2 * member_x + 1, 2 * member_y] = Structures.EMPTY  # carve north
-                        im = ax.imshow(
-                            self.maze.grid.copy(),
-                            cmap='binary',
-                            vmin=Structures.EMPTY,
-                            vmax=Structures.WALL,
-                            animated=True
-                        )
-                        ims.append([im])
-                    run = []
-                else:
-                    pass
-                    self.maze.grid[2 * x + 2, 2 * y + 1] = Structures.EMPTY  # carve east
-                    im = ax.imshow(
-                        self.maze.grid.copy(),
-                        cmap='binary',
-                        vmin=Structures.EMPTY,
-                        vmax=Structures.WALL,
-                        animated=True
-                    )
-                    ims.append([im])
-
-        return animation.ArtistAnimation(fig, ims, interval=100, blit=True)
+        rows_per_block = max(1, self.block_cells // self.maze.width)
+        for first_row in range(0, self.maze.height, rows_per_block):
+            last_row = min(first_row + rows_per_block, self.maze.height)
+            close_out, carve_north = self.draw_rows(first_row, last_row)
+            if batch:
+                yield self.carve_rows(first_row, last_row, close_out, carve_north)
+            else:
+                for row in range(first_row, last_row):
+                    block_row = slice(row - first_row, row - first_row + 1)
+                    yield self.carve_rows(row, row + 1, close_out[block_row], carve_north[block_row])
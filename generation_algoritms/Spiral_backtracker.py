@@ -1,23 +1,25 @@
-import random
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 import numpy as np
-from matplotlib import pyplot as plt, animation
-from matplotlib.animation import Animation
 from Maze import Maze, MazeGenerator
 from settings import Structures
 
 
 class SpiralBacktrackerMazeGenerator(MazeGenerator):
-    def __init__(self, maze: Maze) -> None:
-        super().__init__(maze)
+    def __init__(self, maze: Maze, seed=None, rng=None) -> None:
+        super().__init__(maze, seed=seed, rng=rng)
         self.visited = np.zeros((maze.height, maze.width), dtype=bool)
         self.stack = []
 
-    def generate(self) -> None:
+    def iter_events(self, batch: bool = False) -> Iterator[Tuple]:
+        """
+        Generate the maze with a backtracker walk from the center, yielding an event for every cell added to the maze.
+        :param batch: Not used, the cells are added one at a time.
+        """
         self.maze.reset()
+        self.visited.fill(False)
         cx, cy = self.maze.width // 2, self.maze.height // 2
-        self.stack.append((cx, cy))
+        self.stack = [(cx, cy)]
         self.visited[cx, cy] = True
 
         while self.stack:
@@ -25,17 +27,16 @@ class SpiralBacktrackerMazeGenerator(MazeGenerator):
             neighbors = self.get_unvisited_neighbors(x, y)
 
             if neighbors:
-                nx, ny, wall_x, wall_y = random.choice(neighbors)
-                self.maze.grid[2 * nx + 1, 2 * ny + 1] = Structures.EMPTY
-                self.maze.grid[wall_x, wall_y] = Structures.EMPTY
+                nx, ny, wall_x, wall_y = self.random.choice(neighbors)
                 self.visited[nx, ny] = True
                 self.stack.append((nx, ny))
+                yield self.carve((wall_x, 2 * nx + 1), (wall_y, 2 * ny + 1), Structures.EMPTY)
             else:
                 self.stack.pop()
 
-        self.spiral(cx, cy)
+        yield from self.spiral(cx, cy)
 
-    def spiral(self, x, y):
+    def spiral(self, x, y) -> Iterator[Tuple]:
         directions = [(1, 0), (0, 1), (-1, 0), (0, -1)]
         length = 1
         dx, dy = directions[0]
@@ -46,8 +47,8 @@ class SpiralBacktrackerMazeGenerator(MazeGenerator):
                 for _ in range(length):
                     nx, ny = x + dx, y + dy
                     if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height and not self.visited[nx, ny]:
-                        self.maze.grid[2 * nx + 1, 2 * ny + 1] = Structures.EMPTY
                         self.visited[nx, ny] = True
+                        yield self.carve(2 * nx + 1, 2 * ny + 1, Structures.EMPTY)
                     x, y = nx, ny
                 dir_index = (dir_index + 1) % 4
                 dx, dy = directions[dir_index]
@@ -63,33 +64,3 @@ class SpiralBacktrackerMazeGenerator(MazeGenerator):
             if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height and not self.visited[nx, ny]:
                 neighbors.append((nx, ny, 2 * x + 1 + dx, 2 * y + 1 + dy))
         return neighbors
-
-    def animate(self) -> Animation:
-        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
-        ax.set_xticks([]), ax.set_yticks([])
-        ims = []
-
-        self.maze.reset()
-        cx, cy = self.maze.width // 2, self.maze.height // 2
-        self.stack.append((cx, cy))
-        self.visited[cx, cy] = True
-
-        while self.stack:
-            x, y = self.stack[-1]
-            neighbors = self.get_unvisited_neighbors(x, y)
-
-            if neighbors:
-                nx, ny, wall_x, wall_y = random.choice(neighbors)
-                self.maze.grid[2 * nx + 1, 2 * ny + 1] = Structures.EMPTY
-                self.maze.grid[wall_x, wall_y] = Structures.EMPTY
-                self.visited[nx, ny] = True
-                self.stack.append((nx, ny))
-                im = ax.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL,
-                               animated=True)
-                ims.append([im])
-            else:
-                self.stack.pop()
-
-        self.spiral(cx, cy)
-
-        return animation.ArtistAnimation(fig, ims, interval=100, blit=True)
@@ -1,8 +1,6 @@
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 import numpy as np
-from matplotlib import pyplot as plt, animation
-from matplotlib.animation import Animation
 
 from Maze import MazeGenerator
 from settings import Structures
@@ -19,8 +17,8 @@ class UnicursalMazeGenerator(MazeGenerator):
     4. Ensure the maze has no branches or dead ends.
     """
 
-    def __init__(self, maze):
-        super().__init__(maze)
+    def __init__(self, maze, seed=None, rng=None):
+        super().__init__(maze, seed=seed, rng=rng)
         self.visited = np.zeros((maze.height, maze.width), dtype=np.bool_)
         self.path = []
 
@@ -45,9 +43,10 @@ class UnicursalMazeGenerator(MazeGenerator):
             direction *= -1
         return path
 
-    def generate(self) -> None:
+    def iter_events(self, batch: bool = False) -> Iterator[Tuple]:
         """
-        Generates a unicursal maze.
+        Generates a unicursal maze, yielding an event for every step of the path.
+        :param batch: Not used, the path is carved one step at a time.
         """
         self.maze.reset()
 
@@ -58,46 +57,6 @@ class UnicursalMazeGenerator(MazeGenerator):
         for i in range(len(self.path) - 1):
             x1, y1 = self.path[i]
             x2, y2 = self.path[i + 1]
-            self.maze.grid[2 * x1 + 1, 2 * y1 + 1] = Structures.EMPTY
-            self.maze.grid[2 * x2 + 1, 2 * y2 + 1] = Structures.EMPTY
-            self.maze.grid[(2 * x1 + 1 + 2 * x2 + 1) // 2, (2 * y1 + 1 + 2 * y2 + 1) // 2] = Structures.EMPTY
-
-    def animate(self) -> Animation:
-        """
-        Generate an animation of the maze generation.
-        :return: The animation of the maze generation.
-        """
-        # Adjust figure size based on maze dimensions
-        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
-        ax.set_xticks([]), ax.set_yticks([])
-
-        ims = []
-
-        self.maze.reset()
-        self.path = self.create_path()
-
-        # Calculate marker size based on maze dimensions
-        base_size = 10
-        marker_size = base_size * min(1, base_size / max(self.maze.width, self.maze.height))
-
-        for i in range(len(self.path) - 1):
-            x1, y1 = self.path[i]
-            x2, y2 = self.path[i + 1]
-            self.maze.grid[2 * x1 + 1, 2 * y1 + 1] = Structures.EMPTY
-            self.maze.grid[2 * x2 + 1, 2 * y2 + 1] = Structures.EMPTY
-            self.maze.grid[(2 * x1 + 1 + 2 * x2 + 1) // 2, (2 * y1 + 1 + 2 * y2 + 1) // 2] = Structures.EMPTY
-
-            # Create the image for the current frame
-            im = ax.imshow(
-                self.maze.grid.copy(),
-                cmap='binary',
-                vmin=Structures.EMPTY,
-                vmax=Structures.WALL,
-                animated=True
+            yield self.carve(
+                (2 * x1 + 1, x1 + x2 + 1, 2 * x2 + 1), (2 * y1 + 1, y1 + y2 + 1, 2 * y2 + 1), Structures.EMPTY
             )
-            red_dot, = ax.plot(2 * y1 + 1, 2 * x1 + 1, marker='o', color='red', markersize=marker_size, animated=True)
-
-            # Append the image and the current cell marker to the frame
-            ims.append([im, red_dot])
-
-        return animation.ArtistAnimation(fig, ims, interval=100, blit=True)
@@ -1,8 +1,8 @@
-import random
-from typing import List, Tuple
-from matplotlib import pyplot as plt
-from matplotlib.animation import ArtistAnimation
+from typing import Iterator, Tuple
+
+import numpy as np
 from Maze import MazeGenerator
+from generation_algoritms.Frontier_bag import FrontierBag
 from settings import Structures
 
 
@@ -15,111 +15,101 @@ class WilsonMazeGenerator(MazeGenerator):
     in the maze—however, if at any point the random walk reaches its own path, forming a loop, we erase the loop from the
     path before proceeding. When the path reaches the maze, we add it to the maze. Then we perform another loop-erased
     random walk from another arbitrary starting cell, repeating until all cells have been filled.
+
+    The walk does not store its path. Instead, every cell remembers the direction in which the walk last left it.
+    Following those directions from the starting cell gives the loop-erased path, because revisiting a cell simply
+    overwrites its exit direction and thereby erases the loop.
     """
 
-    def __init__(self, maze):
-        super().__init__(maze)
-        self.visited = set()
+    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # (row, column) offsets: Right, Down, Left, Up
+    # Number of random directions drawn at once from the NumPy Generator
+    block_size = 1 << 16
+
+    def __init__(self, maze, seed=None, rng=None):
+        super().__init__(maze, seed=seed, rng=rng)
+        self.visited = np.zeros((maze.height, maze.width), dtype=np.bool_)  # Cells that are part of the maze
+        self.exit_direction = np.zeros((maze.height, maze.width), dtype=np.int8)
+        self.unvisited = FrontierBag(maze.width * maze.height, self.random)
+        self.random_directions = self._draw_directions()
 
-    def random_walk(self, start: Tuple[int, int]) -> List[Tuple[int, int]]:
+    def _draw_directions(self) -> Iterator[int]:
         """
-        Perform a random walk starting from the given cell.
+        Generate an endless stream of random direction indices, drawn in blocks.
         """
-        path = [start]
-        current = start
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-
-        while current not in self.visited:
-            nx, ny = tuple(map(sum, zip(current, random.choice(directions))))
-            if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height:
-                if (nx, ny) in path:
-                    # Erase loop
-                    loop_start = path.index((nx, ny))
-                    path = path[:loop_start + 1]
-                else:
-                    path.append((nx, ny))
-            current = path[-1]
-
-        return path
+        while True:
+            yield from self.rng.integers(len(self.directions), size=self.block_size).tolist()
 
-    def generate(self) -> None:
+    def _setup(self) -> None:
         """
-        Generates a maze using Wilson's algorithm.
+        Reset the maze and add a random first cell to it.
         """
         self.maze.reset()
-        start_x, start_y = random.randint(0, self.maze.width - 1), random.randint(0, self.maze.height - 1)
-        self.visited.add((start_x, start_y))
+        self.visited.fill(False)
+        self.unvisited = FrontierBag(self.maze.width * self.maze.height, self.random)
+        for cell in range(self.maze.width * self.maze.height):
+            self.unvisited.add(cell)
+        self.visited.reshape(-1)[self.unvisited.pop_random()] = True
 
-        while len(self.visited) < self.maze.width * self.maze.height:
-            unvisited_cells = [(x, y) for x in range(self.maze.width) for y in range(self.maze.height) if (x, y) not in self.visited]
-            start_cell = random.choice(unvisited_cells)
-            path = self.random_walk(start_cell)
-
-            for i in range(len(path) - 1):
-                x1, y1 = path[i]
-                x2, y2 = path[i + 1]
-                self.visited.add((x1, y1))
-                self.visited.add((x2, y2))
-                fx = 2 * x1 + 1
-                fy = 2 * y1 + 1
-                sx = 2 * x2 + 1
-                sy = 2 * y2 + 1
-                wall_x, wall_y = (fx + sx) // 2, (fy + sy) // 2
-                self.maze.grid[fx, fy] = Structures.SELECTED
-                self.maze.grid[sx, sy] = Structures.SELECTED
-                self.maze.grid[wall_x, wall_y] = Structures.SELECTED
-
-    def animate(self) -> ArtistAnimation:
+    def random_walk(self, start: int) -> None:
         """
-        Generate an animation of the maze generation.
-        :return: The animation of the maze generation.
+        Perform a random walk starting from the given cell until a cell of the maze is reached, recording the last exit
+        direction of every cell on the way.
+        :param start: The id (row * width + column) of the starting cell.
         """
-        fig, ax = plt.subplots(figsize=(self.maze.width / 2, self.maze.height / 2))
-        ax.set_xticks([]), ax.set_yticks([])
-
-        ims = []
-
-        self.maze.reset()
-        start_x, start_y = random.randint(0, self.maze.width - 1), random.randint(0, self.maze.height - 1)
-        self.visited = {(start_x, start_y)}
-
-        base_size = 10
-        marker_size = base_size * min(1, base_size / max(self.maze.width, self.maze.height))
-
-        while len(self.visited) < self.maze.width * self.maze.height:
-            unvisited_cells = [(x, y) for x in range(self.maze.width) for y in range(self.maze.height) if (x, y) not in self.visited]
-            start_cell = random.choice(unvisited_cells)
-            path = self.random_walk(start_cell)
-
-            for i in range(len(path) - 1):
-                x1, y1 = path[i]
-                x2, y2 = path[i + 1]
-                self.visited.add((x1, y1))
-                self.visited.add((x2, y2))
-                fx = 2*x1+1
-                fy = 2*y1+1
-                sx = 2*x2+1
-                sy = 2*y2+1
-                wall_x, wall_y = (fx + sx) // 2, (fy + sy) // 2
-                self.maze.grid[fx, fy] = Structures.SELECTED
-                self.maze.grid[sx, sy] = Structures.SELECTED
-                self.maze.grid[wall_x, wall_y] = Structures.SELECTED
-
-                # Create the image for the current frame
-                im = ax.imshow(
-                    self.maze.grid.copy(),
-                    cmap='binary',
-                    vmin=Structures.EMPTY,
-                    vmax=Structures.WALL,
-                    animated=True
-                )
-                red_dot, = ax.plot(
-                    2 * y2 + 1, 2 * x2 + 1,
-                    marker='o',
-                    color='red',
-                    markersize=marker_size,
-                    animated=True
-                )
-                ims.append([im, red_dot])
-
-        return ArtistAnimation(fig, ims, interval=100, blit=True)
+        width, height = self.maze.width, self.maze.height
+        visited = self.visited.reshape(-1)
+        exit_direction = self.exit_direction.reshape(-1)
+        random_directions = self.random_directions
+        row, column = divmod(start, width)
+        cell = start
+
+        while not visited[cell]:
+            direction = next(random_directions)
+            d_row, d_column = self.directions[direction]
+            next_row, next_column = row + d_row, column + d_column
+            if 0 <= next_row < height and 0 <= next_column < width:
+                exit_direction[cell] = direction
+                row, column = next_row, next_column
+                cell = row * width + column
+
+    def add_path(self, start: int) -> Iterator[Tuple]:
+        """
+        Add the loop-erased path starting in the given cell to the maze, by following the recorded exit directions.
+        :param start: The id of the cell the random walk started from.
+        :return: The event of every step along the path.
+        """
+        width = self.maze.width
+        visited = self.visited.reshape(-1)
+        exit_direction = self.exit_direction.reshape(-1)
+        row, column = divmod(start, width)
+        cell = start
+
+        while not visited[cell]:
+            visited[cell] = True
+            if cell != start:
+                self.unvisited.remove(cell)
+            d_row, d_column = self.directions[exit_direction[cell]]
+            rows = (2 * row + 1, 2 * row + 1 + d_row, 2 * row + 1 + 2 * d_row)
+            columns = (2 * column + 1, 2 * column + 1 + d_column, 2 * column + 1 + 2 * d_column)
+            row, column = row + d_row, column + d_column
+            cell = row * width + column
+            yield self.carve(rows, columns, Structures.SELECTED)
+
+    def iter_events(self, batch: bool = False) -> Iterator[Tuple]:
+        """
+        Generates a maze using Wilson's algorithm, yielding an event for every step of the added paths.
+        :param batch: Should every added path be yielded as one event?
+        """
+        self._setup()
+
+        while self.unvisited:
+            start_cell = self.unvisited.pop_random()
+            self.random_walk(start_cell)
+            if batch:
+                rows, columns = [], []
+                for event_rows, event_columns, _ in self.add_path(start_cell):
+                    rows.extend(event_rows)
+                    columns.extend(event_columns)
+                yield rows, columns, Structures.SELECTED
+            else:
+                yield from self.add_path(start_cell)
@@ -1,5 +1,6 @@
 import os
 
+from Cache import MazeCache
 from Maze import Maze
 from generation_algoritms.Aldous_broder import AldousBroderMazeGenerator
 from generation_algoritms.Origin_shift import OriginShiftGenerator
@@ -23,10 +24,14 @@ from settings import sizeWidth, sizeHeight, animations_dir, animate, mazes_dir,
     side_winder, solve_side_winder, solve_eller, eller, hunt_and_kill, solve_hunt_and_kill, spiral_backtracker, \
     solve_spiral_backtracker, sigma, solve_sigma, solve_unicursal, unicursal, binary_tree, solve_binary_tree, \
     origin_shift, \
-    solve_origin_shift, solutions_dir, solutions_animation_dir
+    solve_origin_shift, solutions_dir, solutions_animation_dir, seed, use_cache, cache_dir, cache_max_bytes
 from solvingMain import solveMaze
 
 
+# Generated mazes can only be found back in the cache when their seed is fixed
+cache = MazeCache(cache_dir, cache_max_bytes) if use_cache and seed is not None else None
+
+
 def run_generation(generator, run_gen: bool, run_solve: bool, short_name: str, map_name: str, maze: Maze):
     os.makedirs(mazes_dir, exist_ok=True)
     os.makedirs(animations_dir, exist_ok=True)
@@ -34,14 +39,15 @@ def run_generation(generator, run_gen: bool, run_solve: bool, short_name: str, m
     os.makedirs(solutions_animation_dir, exist_ok=True)
     if run_gen:
         print(f"{short_name} maze generation start")
-        generator(
-            maze
-        ).run(
+        maze_generator = generator(maze, seed=seed)
+        print(f"{short_name} maze seed: {maze_generator.seed}")
+        maze_generator.run(
             maze_filename=mazes_dir + f"{map_name}_maze" +
             (f"_{sizeWidthFractal}x{sizeHeightFractal}" if add_maze_size_to_name else "") + mazes_filetype,
             animate=animate,
             animation_filename=animations_dir + f'{map_name}_maze_animation' +
-            (f"_{sizeWidthFractal}x{sizeHeightFractal}" if add_maze_size_to_name else "") + animations_filetype
+            (f"_{sizeWidthFractal}x{sizeHeightFractal}" if add_maze_size_to_name else "") + animations_filetype,
+            cache=cache
         )
         print(f"{short_name} maze generation done")
         if run_solve:
@@ -17,6 +17,11 @@ animations_filetype = ".mp4"
 solutions_filetype = ".png"
 solutions_animation_filetype = ".mp4"
 origin_shift_iterations = 300
+pixels_per_cell = 10  # The width and height in pixels of every wall or passage square in saved maze images
+seed = None  # The seed of every generation run, so the mazes can be reproduced (a fresh seed per run if None)
+use_cache = True  # Should generated mazes be cached on disk? (only used when the seed is set)
+cache_dir = "cache/"  # The directory of the maze cache
+cache_max_bytes = 1 << 30  # The size cap of the maze cache, the least recently used mazes are evicted above it
 
 
 # what mazes need to be generated
@@ -66,6 +71,10 @@ bfs_solver = run_solver
 dijkstra_solver = run_solver
 a_star_solver_manhattan = run_solver
 a_star_solver_euclidean = run_solver
+bidirectional_bfs_solver = run_solver
+bidirectional_a_star_solver_manhattan = run_solver
+# Off by default: with the Euclidean heuristic the bidirectional search is neither shortest nor cheaper than A*
+bidirectional_a_star_solver_euclidean = False
 dead_end_filling_solver = run_solver
 
 
@@ -73,3 +82,26 @@ class Structures:
     WALL = 4
     SELECTED = 2
     EMPTY = 0
+
+
+class WallMask:
+    """
+    The bits of the compact one byte per cell maze representation (see Maze.to_wall_mask).
+    """
+    NORTH = 1
+    EAST = 2
+    SOUTH = 4
+    WEST = 8
+    CELL_SELECTED = 16  # The cell itself is SELECTED
+    EAST_SELECTED = 32  # The open passage to the east is SELECTED
+    SOUTH_SELECTED = 64  # The open passage to the south is SELECTED
+    FILLED = 128  # The cell and its open passages are filled dead ends (WALL - 1), only used in solver overlays
+
+
+class MazeEncoding:
+    """
+    The payload encodings of the binary maze file format (see Maze.dump).
+    """
+    RAW = 0  # The int8 grid, row by row
+    PACKED_WALLS = 1  # The east/south wall bits of every cell, packed with np.packbits (see Maze.to_packed_walls)
+    WALL_MASK = 2  # One byte per cell, lossless (see Maze.to_wall_mask)
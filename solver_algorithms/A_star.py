@@ -1,8 +1,6 @@
 import heapq
 
 from Maze import Solver
-from settings import Structures
-import matplotlib.pyplot as plt
 
 
 class AStarSolver(Solver):
@@ -22,7 +20,6 @@ class AStarSolver(Solver):
         (the Euclidean distance is calculated without the square root to give more weight to the distances)
         """
         super().__init__(maze)
-        self.maze.grid[self.maze.grid == Structures.SELECTED] = Structures.EMPTY
         self.manhattan = manhattan
 
     def solve_step(self, start, end, animate):
@@ -35,57 +32,53 @@ class AStarSolver(Solver):
         :param end: Tuple[int, int], the ending position in the maze.
         :param animate: bool, whether to animate the solving process.
         """
+        self.adjacency = adjacency = self.maze.adjacency()
+        indptr, indices = adjacency.lists()
+        select = self.select
+        width = self.maze.width
+        start_cell, end_cell = adjacency.cell(start), adjacency.cell(end)
+
         priority_queue = []
-        heapq.heappush(priority_queue, (0, start))
-        parent = {start: None}
-        g_cost = {start: 0}
-        start_x, start_y = start
-        self.visited[start_x, start_y] = True
-        self.maze.grid[2 * start_x + 1, 2 * start_y + 1] = Structures.SELECTED
+        heapq.heappush(priority_queue, (0, start_cell))
+        parent = {start_cell: None}
+        g_cost = {start_cell: 0}
+        select(start_cell)
 
         while priority_queue:
-            current_cost, (x, y) = heapq.heappop(priority_queue)
-            cell_x, cell_y = 2 * x + 1, 2 * y + 1
+            current_cost, cell = heapq.heappop(priority_queue)
+            self.expanded += 1
 
-            if (x, y) == end:
-                self._construct_path(parent, end)
+            if cell == end_cell:
+                self._construct_path(parent, end_cell)
                 return True
 
-            directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # Right, Down, Left, Up
-
-            for dx, dy in directions:
-                nx, ny = x + dx, y + dy
-                new_g_cost = g_cost.get((x, y)) + 1  # Uniform cost for each step
+            new_g_cost = g_cost[cell] + 1  # Uniform cost for each step
+            for neighbor in indices[indptr[cell]:indptr[cell + 1]]:
+                if neighbor not in parent:
+                    g_cost[neighbor] = new_g_cost
+                    nx, ny = divmod(neighbor, width)
+                    if manhattan:
+                        h_cost = abs(nx - end[0]) + abs(ny - end[1])  # Manhattan distance
+                    else:
+                        h_cost = abs(nx - end[0]) ** 2 + abs(ny - end[1]) ** 2  # Euclidian distance without sqrt
+                    f_cost = new_g_cost + h_cost
+                    heapq.heappush(priority_queue, (f_cost, neighbor))
+                    parent[neighbor] = cell
+                    select(neighbor, cell)
 
-                if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height and  \
-                        not self.visited[nx, ny] and self.maze.grid[2*nx+1-dx, 2*ny+1-dy] != Structures.WALL:
-                    if (nx, ny) not in g_cost or new_g_cost < g_cost[(nx, ny)]:
-                        g_cost[(nx, ny)] = new_g_cost
-                        if manhattan:
-                            h_cost = abs(nx - end[0]) + abs(ny - end[1])  # Manhattan distance
-                        else:
-                            h_cost = abs(nx - end[0]) ** 2 + abs(ny - end[1]) ** 2  # Euclidian distance without sqrt
-                        f_cost = new_g_cost + h_cost
-                        heapq.heappush(priority_queue, (f_cost, (nx, ny)))
-                        parent[(nx, ny)] = (x, y)
-                        self.visited[nx, ny] = True
-                        self.maze.grid[2 * nx + 1, 2 * ny + 1] = Structures.SELECTED
-                        self.maze.grid[cell_x + dx, cell_y + dy] = Structures.SELECTED
-
-                        if animate:
-                            im = plt.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL, animated=True)
-                            self.ims.append([im])
+                    if animate:
+                        self.add_frame()
 
         return False
 
     def _construct_path(self, parent, end):
         """
         Construct the path from start to end using the parent dictionary.
-        :param parent: Dict[Tuple[int, int], Tuple[int, int]], the parent dictionary.
-        :param end: Tuple[int, int], the ending position in the maze.
+        :param parent: Dict[int, int], the parent cell id of every reached cell.
+        :param end: int, the id of the ending cell.
         """
         current = end
         while current is not None:
-            self.path.append((2 * current[0] + 1, 2 * current[1] + 1))
+            self.path.append(self.adjacency.grid_position(current))
             current = parent[current]
         self.path.reverse()
\ No newline at end of file
@@ -1,8 +1,6 @@
 from collections import deque
 
 from Maze import Solver
-from settings import Structures
-import matplotlib.pyplot as plt
 
 
 class BFSSolver(Solver):
@@ -15,7 +13,6 @@ class BFSSolver(Solver):
     """
     def __init__(self, maze):
         super().__init__(maze)
-        self.maze.grid[self.maze.grid == Structures.SELECTED] = Structures.EMPTY
 
     def solve_step(self, start, end, animate):
         self._bfs(start, end, animate=animate)
@@ -27,44 +24,42 @@ class BFSSolver(Solver):
         :param end: Tuple[int, int], the ending position in the maze.
         :param animate: bool, whether to animate the solving process.
         """
-        queue = deque([start])
-        parent = {start: None}
-        self.visited[start[0], start[1]] = True
-        self.maze.grid[2 * start[0] + 1, 2 * start[1] + 1] = Structures.SELECTED
+        self.adjacency = adjacency = self.maze.adjacency()
+        indptr, indices = adjacency.lists()
+        select = self.select
+        start_cell, end_cell = adjacency.cell(start), adjacency.cell(end)
+
+        queue = deque([start_cell])
+        parent = {start_cell: None}
+        select(start_cell)
 
         while queue:
-            x, y = queue.popleft()
-            cell_x, cell_y = 2 * x + 1, 2 * y + 1
+            cell = queue.popleft()
+            self.expanded += 1
 
-            if (x, y) == end:
-                self._construct_path(parent, end)
+            if cell == end_cell:
+                self._construct_path(parent, end_cell)
                 return True
 
-            directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # Right, Down, Left, Up
-
-            for dx, dy in directions:
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height and not self.visited[nx, ny] and self.maze.grid[2*nx+1-dx, 2*ny+1-dy] != Structures.WALL:
-                    queue.append((nx, ny))
-                    parent[(nx, ny)] = (x, y)
-                    self.visited[nx, ny] = True
-                    self.maze.grid[2 * nx + 1, 2 * ny + 1] = Structures.SELECTED
-                    self.maze.grid[cell_x + dx, cell_y + dy] = Structures.SELECTED
+            for neighbor in indices[indptr[cell]:indptr[cell + 1]]:
+                if neighbor not in parent:
+                    queue.append(neighbor)
+                    parent[neighbor] = cell
+                    select(neighbor, cell)
 
                     if animate:
-                        im = plt.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL, animated=True)
-                        self.ims.append([im])
+                        self.add_frame()
 
         return False
 
     def _construct_path(self, parent, end):
         """
         Construct the path from start to end using the parent dictionary.
-        :param parent: Dict[Tuple[int, int], Tuple[int, int]], the parent dictionary.
-        :param end: Tuple[int, int], the ending position in the maze.
+        :param parent: Dict[int, int], the parent cell id of every reached cell.
+        :param end: int, the id of the ending cell.
         """
         current = end
         while current is not None:
-            self.path.append((2 * current[0] + 1, 2 * current[1] + 1))
+            self.path.append(self.adjacency.grid_position(current))
             current = parent[current]
         self.path.reverse()
@@ -0,0 +1,117 @@
+import heapq
+
+from Maze import Solver
+
+
+class BidirectionalAStarSolver(Solver):
+    """
+    An A* search from both the start and the end at the same time, each guided towards the cell the other one starts
+    from (see AStarSolver for the heuristics).
+
+    Every step expands a cell of the search with the smaller open list. Whenever a search reaches a cell the other one
+    reached, the two paths joined there are a candidate path. The search stops once the lowest estimated cost on either
+    open list is no lower than the best candidate, because with the manhattan heuristic (which never overestimates)
+    no path through the unexpanded cells of that search can be shorter. Like AStarSolver, the Euclidean heuristic
+    (without square root) can overestimate, so then the path is not always the shortest.
+    """
+    def __init__(self, maze, manhattan=False):
+        """
+        :param manhattan: Should we use manhattan distance or Euclidean ? (manhattan if true Euclidean distance else)
+        """
+        super().__init__(maze)
+        self.manhattan = manhattan
+
+    def solve_step(self, start, end, animate):
+        self._bidirectional_a_star(start, end, manhattan=self.manhattan, animate=animate)
+
+    def _bidirectional_a_star(self, start, end, animate=False, manhattan=False):
+        """
+        The bidirectional A* algorithm function.
+        :param start: Tuple[int, int], the starting position in the maze.
+        :param end: Tuple[int, int], the ending position in the maze.
+        :param animate: bool, whether to animate the solving process.
+        """
+        self.adjacency = adjacency = self.maze.adjacency()
+        indptr, indices = adjacency.lists()
+        select = self.select
+        width = self.maze.width
+        size = width * self.maze.height
+        start_cell, end_cell = adjacency.cell(start), adjacency.cell(end)
+
+        # The cost from the start or end (-1 if not reached) and parent of every cell, for both searches
+        g_costs = ([-1] * size, [-1] * size)
+        parents = ([-1] * size, [-1] * size)
+        expanded = ([False] * size, [False] * size)
+        targets = (end, start)
+        priority_queues = ([(0, start_cell)], [(0, end_cell)])
+        g_costs[0][start_cell] = g_costs[1][end_cell] = 0
+        select(start_cell)
+        select(end_cell)
+
+        best, meeting = size, None
+        if start_cell == end_cell:
+            best, meeting = 0, (start_cell, end_cell)
+
+        while priority_queues[0] and priority_queues[1]:
+            if meeting is not None and (priority_queues[0][0][0] >= best or priority_queues[1][0][0] >= best):
+                break
+            side = 0 if len(priority_queues[0]) <= len(priority_queues[1]) else 1
+            priority_queue, g_cost, other_g_cost = priority_queues[side], g_costs[side], g_costs[1 - side]
+            parent, (target_x, target_y) = parents[side], targets[side]
+
+            current_cost, cell = heapq.heappop(priority_queue)
+            cx, cy = divmod(cell, width)
+            if manhattan:
+                h_cost = abs(cx - target_x) + abs(cy - target_y)
+            else:
+                h_cost = abs(cx - target_x) ** 2 + abs(cy - target_y) ** 2
+            if current_cost > g_cost[cell] + h_cost or expanded[1 - side][cell]:
+                # The cell was reached again with a lower cost after this entry was pushed, or the other search
+                # expanded it already, so the best path through it is a candidate already
+                continue
+            expanded[side][cell] = True
+            self.expanded += 1
+
+            new_g_cost = g_cost[cell] + 1  # Uniform cost for each step
+            for neighbor in indices[indptr[cell]:indptr[cell + 1]]:
+                if g_cost[neighbor] < 0 or new_g_cost < g_cost[neighbor]:
+                    first_visit = g_cost[neighbor] < 0
+                    g_cost[neighbor] = new_g_cost
+                    nx, ny = divmod(neighbor, width)
+                    if manhattan:
+                        h_cost = abs(nx - target_x) + abs(ny - target_y)  # Manhattan distance
+                    else:
+                        h_cost = abs(nx - target_x) ** 2 + abs(ny - target_y) ** 2  # Euclidian distance without sqrt
+                    parent[neighbor] = cell
+                    if other_g_cost[neighbor] >= 0 and new_g_cost + other_g_cost[neighbor] < best:
+                        best = new_g_cost + other_g_cost[neighbor]
+                        meeting = (neighbor, neighbor)
+                    if meeting is None or new_g_cost + h_cost < best:  # Paths through it can not be shorter
+                        heapq.heappush(priority_queue, (new_g_cost + h_cost, neighbor))
+                    if first_visit:
+                        select(neighbor, cell)
+
+                        if animate:
+                            self.add_frame()
+
+        if meeting is None:
+            return False
+        self._construct_path(parents, *meeting)
+        return True
+
+    def _construct_path(self, parents, forward, backward):
+        """
+        Construct the path from start to end through the cells where the two searches meet.
+        :param parents: Tuple[List[int], List[int]], the parent cell id of every cell reached from the start and end.
+        :param forward: int, the id of the last cell of the path reached from the start.
+        :param backward: int, the id of the first cell of the path after it, reached from the end.
+        """
+        current = forward
+        while current >= 0:
+            self.path.append(self.adjacency.grid_position(current))
+            current = parents[0][current]
+        self.path.reverse()
+        current = backward if backward != forward else parents[1][backward]
+        while current >= 0:
+            self.path.append(self.adjacency.grid_position(current))
+            current = parents[1][current]
@@ -0,0 +1,85 @@
+from Maze import Solver
+
+
+class BidirectionalBFSSolver(Solver):
+    """
+    A breadth-first search from both the start and the end at the same time.
+
+    Every step expands one whole level of the smaller of the two frontiers. As soon as a level reaches a cell that the
+    other search reached before, the level is finished and the shortest of the connections it found is the path: any
+    shorter path would have been found by an earlier level. Both searches only go about half as deep as a single BFS,
+    so in winding mazes they visit far fewer cells together than one search from the start.
+    """
+    def __init__(self, maze):
+        super().__init__(maze)
+
+    def solve_step(self, start, end, animate):
+        self._bidirectional_bfs(start, end, animate=animate)
+
+    def _bidirectional_bfs(self, start, end, animate=False):
+        """
+        The bidirectional BFS function.
+        :param start: Tuple[int, int], the starting position in the maze.
+        :param end: Tuple[int, int], the ending position in the maze.
+        :param animate: bool, whether to animate the solving process.
+        """
+        self.adjacency = adjacency = self.maze.adjacency()
+        indptr, indices = adjacency.lists()
+        select = self.select
+        size = self.maze.width * self.maze.height
+        start_cell, end_cell = adjacency.cell(start), adjacency.cell(end)
+
+        # The distance (-1 if not reached) and parent of every cell, for the search from the start and from the end
+        distances = ([-1] * size, [-1] * size)
+        parents = ([-1] * size, [-1] * size)
+        frontiers = [[start_cell], [end_cell]]
+        distances[0][start_cell] = distances[1][end_cell] = 0
+        select(start_cell)
+        select(end_cell)
+        if start_cell == end_cell:
+            self._construct_path(parents, start_cell, end_cell)
+            return True
+
+        best, meeting = size, None
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            distance, other_distance, parent = distances[side], distances[1 - side], parents[side]
+            next_frontier = []
+            for cell in frontiers[side]:
+                self.expanded += 1
+                for neighbor in indices[indptr[cell]:indptr[cell + 1]]:
+                    if other_distance[neighbor] >= 0 and distance[cell] + 1 + other_distance[neighbor] < best:
+                        best = distance[cell] + 1 + other_distance[neighbor]
+                        meeting = (cell, neighbor) if side == 0 else (neighbor, cell)
+                    if distance[neighbor] < 0:
+                        distance[neighbor] = distance[cell] + 1
+                        parent[neighbor] = cell
+                        next_frontier.append(neighbor)
+                        select(neighbor, cell)
+
+                        if animate:
+                            self.add_frame()
+            frontiers[side] = next_frontier
+
+            if meeting is not None:
+                self._construct_path(parents, *meeting)
+                return True
+
+        return False
+
+    def _construct_path(self, parents, forward, backward):
+        """
+        Construct the path from start to end through the cells where the two searches meet.
+        :param parents: Tuple[List[int], List[int]], the parent cell id of every cell reached from the start and end.
+        :param forward: int, the id of the last cell of the path reached from the start.
+        :param backward: int, the id of the first cell of the path after it, reached from the end.
+        """
+        current = forward
+        while current >= 0:
+            self.path.append(self.adjacency.grid_position(current))
+            current = parents[0][current]
+        self.path.reverse()
+        current = backward if backward != forward else parents[1][backward]
+        while current >= 0:
+            self.path.append(self.adjacency.grid_position(current))
+            current = parents[1][current]
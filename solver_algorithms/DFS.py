@@ -1,8 +1,8 @@
+import numpy as np
+
 from Maze import Solver
 from settings import Structures
 
-import matplotlib.pyplot as plt
-
 
 class DFSSolver(Solver):
     """
@@ -19,10 +19,9 @@ class DFSSolver(Solver):
     """
     def __init__(self, maze):
         super().__init__(maze)
-        self.maze.grid[self.maze.grid == Structures.SELECTED] = Structures.EMPTY
 
     def solve_step(self, start, end, animate):
-        self._dfs_stack(start, end, animate=True)
+        self._dfs_stack(start, end, animate=animate)
 
     def _dfs_stack(self, start, end, animate=False):
         """
@@ -31,62 +30,78 @@ class DFSSolver(Solver):
         :param end: Tuple[int, int], the ending position in the maze.
         :param animate: bool, whether to animate the solving process.
         """
-        stack = [(start, [(2*start[0]+1, 2*start[1]+1)])]
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # Right, Down, Left, Up
+        self.adjacency = adjacency = self.maze.adjacency()
+        indptr, indices = adjacency.lists()
+        select, select_passage = self.select, self.select_passage
+        start_cell, end_cell = adjacency.cell(start), adjacency.cell(end)
+
+        # Every entry is a cell and the cell it was reached from, the path is rebuilt from the parents at the end
+        stack = [(start_cell, None)]
+        parent = {}
 
         while stack:
-            (x, y), current_path = stack.pop()
-            cell_x, cell_y = 2 * x + 1, 2 * y + 1
+            cell, previous = stack.pop()
+            if cell in parent:
+                continue
+            parent[cell] = previous
 
-            if (x, y) == end:
-                self.path = current_path
+            if cell == end_cell:
+                self._construct_path(parent, end_cell)
                 return True
 
-            self.visited[x, y] = True
-            self.maze.grid[cell_x, cell_y] = Structures.SELECTED
+            select(cell)
 
             if animate:
-                im = plt.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL,
-                                animated=True)
-                self.ims.append([im])
+                self.add_frame()
 
-            for dx, dy in directions:
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height and not self.visited[nx, ny] and self.maze.grid[2*nx+1-dx, 2*ny+1-dy] != Structures.WALL:
-                    self.maze.grid[2 * x + 1 + dx, 2 * y + 1 + dy] = Structures.SELECTED
-                    stack.append(((nx, ny), current_path + [(2*nx+1, 2*ny+1)]))
+            for neighbor in indices[indptr[cell]:indptr[cell + 1]]:
+                if neighbor not in parent:
+                    select_passage(cell, neighbor)
+                    stack.append((neighbor, cell))
 
         return False
 
-    def _dfs(self, current, end, animate=False):
+    def _construct_path(self, parent, end):
+        """
+        Construct the path from start to end using the parent dictionary.
+        :param parent: Dict[int, int], the parent cell id of every visited cell.
+        :param end: int, the id of the ending cell.
+        """
+        current = end
+        while current is not None:
+            self.path.append(self.adjacency.grid_position(current))
+            current = parent[current]
+        self.path.reverse()
+
+    def _dfs(self, current, end, animate=False, visited=None):
         """
         The recursive DFS function.
         :param current: Tuple[int, int], the current position in the maze.
         :param end: Tuple[int, int], the ending point of the maze.
+        :param visited: np.ndarray, the cells visited so far (allocated by the outermost call if None).
         :return: bool, True if the end is found, otherwise False.
         """
+        if visited is None:
+            visited = np.zeros((self.maze.height, self.maze.width), dtype=bool)
         x, y = current
         if current == end:
             self.path.append((2*x+1, 2*y+1))
             return True
 
-        self.visited[x, y] = True
-        self.maze.grid[2*x+1, 2*y+1] = Structures.SELECTED
+        visited[x, y] = True
+        self.select(x * self.maze.width + y)
         self.path.append((2*x+1, 2*y+1))
 
         directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # Right, Down, Left, Up
 
         if animate:
-            im = plt.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL,
-                            animated=True)
-            # red_dot, = plt.plot(2 * y + 1, 2 * x + 1, marker='o', color='red', markersize=5, animated=True)
-            self.ims.append([im])
+            self.add_frame()
 
         for dx, dy in directions:
             nx, ny = x + dx, y + dy
-            if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height and not self.visited[nx, ny] and self.maze.grid[2*nx+1-dx, 2*ny+1-dy] != Structures.WALL:
-                self.maze.grid[2 * x + 1+dx, 2 * y + 1+dy] = Structures.SELECTED
-                if self._dfs((nx, ny), end, animate=animate):
+            if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height and not visited[nx, ny] and self.maze.grid[2*nx+1-dx, 2*ny+1-dy] != Structures.WALL:
+                self.select_passage(x * self.maze.width + y, nx * self.maze.width + ny)
+                if self._dfs((nx, ny), end, animate=animate, visited=visited):
                     return True
 
         self.path.pop()
@@ -1,7 +1,4 @@
-import random
-
-import matplotlib.pyplot as plt
-
+import Raster
 from Maze import Solver
 from settings import Structures
 
@@ -11,9 +8,12 @@ class RandomMouseSolver(Solver):
     This simple method can be implemented by a very unintelligent robot or perhaps a mouse, because it does not
     require any memory. The robot proceeds following a random decision about the next direction to follow.
     """
-    def __init__(self, maze):
-        super().__init__(maze)
-        self.maze.grid[self.maze.grid == Structures.SELECTED] = Structures.EMPTY
+    def __init__(self, maze, seed=None, rng=None):
+        """
+        :param seed: The seed of the random decisions of the mouse (see Maze.random_state).
+        :param rng: A NumPy Generator to draw from instead of seeding a new one.
+        """
+        super().__init__(maze, seed=seed, rng=rng)
 
     def solve_step(self, start, end, animate):
         self._random_mouse(start, end, animate=animate)
@@ -32,20 +32,13 @@ class RandomMouseSolver(Solver):
             # print(current, end, len(self.path), self.path)
             x, y = current
             cell_x, cell_y = 2 * x + 1, 2 * y + 1
-            self.visited[x, y] = True
-            self.maze.grid[cell_x, cell_y] = Structures.SELECTED
+            self.select(x * self.maze.width + y)
             self.path.append((cell_x, cell_y))
 
             if animate:
-                im = plt.imshow(self.maze.grid.copy(), cmap='binary', vmin=Structures.EMPTY, vmax=Structures.WALL,
-                                animated=True)
-                # Plot the current cell
-                red_dot, = plt.plot(cell_y, cell_x, marker='o', color='red', markersize=5, animated=True)
-
-                # Append the image and the current cell marker to the frame
-                self.ims.append([im, red_dot])
+                self.add_frame([(cell_x, cell_y, Raster.PATH)])  # Mark the current cell
 
-            random.shuffle(directions)
+            self.random.shuffle(directions)
             moved = False
 
             for dx, dy in directions:
@@ -53,7 +46,7 @@ class RandomMouseSolver(Solver):
                 if 0 <= nx < self.maze.width and 0 <= ny < self.maze.height and \
                         self.maze.grid[2 * nx + 1 - dx, 2 * ny + 1 - dy] != Structures.WALL:
                     # print((dx, dy))
-                    self.maze.grid[cell_x + dx, cell_y + dy] = Structures.SELECTED
+                    self.select_passage(x * self.maze.width + y, nx * self.maze.width + ny)
                     current = (nx, ny)
                     moved = True
                     break
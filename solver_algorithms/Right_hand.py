@@ -1,5 +1,5 @@
 from Maze import Solver
-from settings import Structures
+from settings import Structures, WallMask
 
 
 class RightHandRuleSolver(Solver):
@@ -8,7 +8,11 @@ class RightHandRuleSolver(Solver):
     """
     def __init__(self, maze):
         super().__init__(maze, reverse_path=False)
-        self.maze.grid[self.maze.grid == Structures.EMPTY] = Structures.SELECTED
+
+    def solve_setup(self, start=None, end=None, animate=False):
+        super().solve_setup(start, end, animate=animate)
+        # Show every cell and passage as selected, the marks on walls are not drawn
+        self.overlay.fill(WallMask.CELL_SELECTED | WallMask.EAST_SELECTED | WallMask.SOUTH_SELECTED)
 
     def solve_step(self, start, end, animate):
         self.path = self.solve_helper(start, end)
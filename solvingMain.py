@@ -1,8 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from settings import solutions_animation_dir, add_maze_size_to_name, solutions_animation_filetype, solutions_dir, \
     solutions_filetype, random_mouse_solver, right_hand_rule_solver, left_hand_rule_solver, a_star_solver_manhattan, \
-    a_star_solver_euclidean, dfs_solver, bfs_solver, dijkstra_solver, dead_end_filling_solver
+    a_star_solver_euclidean, dfs_solver, bfs_solver, dijkstra_solver, dead_end_filling_solver, \
+    bidirectional_bfs_solver, bidirectional_a_star_solver_manhattan, bidirectional_a_star_solver_euclidean
 from solver_algorithms.A_star import AStarSolver
 from solver_algorithms.BFS import BFSSolver
+from solver_algorithms.Bidirectional_A_star import BidirectionalAStarSolver
+from solver_algorithms.Bidirectional_BFS import BidirectionalBFSSolver
 from solver_algorithms.DFS import DFSSolver
 from solver_algorithms.Dead_end_filling import DeadEndFiller
 from solver_algorithms.Dijkstra import DijkstraSolver
@@ -12,161 +17,55 @@ from solver_algorithms.Right_hand import RightHandRuleSolver
 import os
 
 
-def solveMaze(maze, name, animate=False):
+def solveMaze(maze, name, animate=False, workers=None):
+    """
+    Solve a maze with every enabled solver and save the solutions (and the animations of the solving).
+    The solvers only read the maze, so they run at the same time in threads on the one maze. This pays off most for
+    the animations, which are encoded by ffmpeg processes running side by side on the other cores.
+    :param maze: The maze to solve.
+    :param name: The name of the directories the solutions are saved in.
+    :param animate: Should the solving be animated?
+    :param workers: The maximum number of solvers running at the same time, the number of cores if None.
+    """
     # print(f"working in {solutions_animation_dir + name}")
     os.makedirs(solutions_animation_dir + name, exist_ok=True)
     os.makedirs(solutions_dir + name, exist_ok=True)
-    if random_mouse_solver:
-        print(f"{name} maze solve with Random mouse start")
-        maze.save_path(
-            RandomMouseSolver(
-                maze
-            ).solve(
-                (0, 0),
-                (maze.width - 1, maze.height - 1),
-                animate=animate,
-                animation_filename=solutions_animation_dir + name + "/Random_Mouse" +
-                (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_animation_filetype
-            )
-            , solutions_dir + name + "/Random_Mouse" +
-            (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_filetype
-        )
-        print(f"{name} maze solve with Random mouse done")
-
-    if right_hand_rule_solver:
-        print(f"{name} maze solve with right hand rule start")
-        maze.save_path(
-            RightHandRuleSolver(
-                maze
-            ).solve(
-                (0, 0),
-                (maze.width - 1, maze.height - 1),
-                animate=animate,
-                animation_filename=solutions_animation_dir + name + "/Right_Hand_rule" +
-                (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_animation_filetype
-            )
-            , solutions_dir + name + "/Right_Hand_rule" +
-            (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_filetype
-        )
-        print(f"{name} maze solve with right hand rule done")
-
-    if left_hand_rule_solver:
-        print(f"{name} maze solve with left hand rule start")
-        maze.save_path(
-            LeftHandRuleSolver(
-                maze
-            ).solve(
-                (0, 0),
-                (maze.width - 1, maze.height - 1),
-                animate=animate,
-                animation_filename=solutions_animation_dir + name + "/Left_Hand_rule" +
-                (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_animation_filetype
-            )
-            , solutions_dir + name + "/Left_Hand_rule" +
-            (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_filetype
-        )
-        print(f"{name} maze solve with left hand rule done")
-
-    if dfs_solver:
-        print(f"{name} maze solve with DFS start")
-        maze.save_path(
-            DFSSolver(
-                maze
-            ).solve(
-                (0, 0),
-                (maze.width - 1, maze.height - 1),
-                animate=animate,
-                animation_filename=solutions_animation_dir + name + "/DFS" +
-                (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_animation_filetype
-            )
-            , solutions_dir + name + "/DFS" +
-            (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_filetype
-        )
-        print(f"{name} maze solve with DFS done")
-
-    if bfs_solver:
-        print(f"{name} maze solve with BFS start")
-        maze.save_path(
-            BFSSolver(
-                maze
-            ).solve(
-                (0, 0),
-                (maze.width - 1, maze.height - 1),
-                animate=animate,
-                animation_filename=solutions_animation_dir + name + "/BFS" +
-                (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_animation_filetype
-            )
-            , solutions_dir + name + "/BFS" +
-            (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_filetype
-        )
-        print(f"{name} maze solve with BFS done")
 
-    if dijkstra_solver:
-        print(f"{name} maze solve with Dijkstra start")
-        maze.save_path(
-            DijkstraSolver(
-                maze
-            ).solve(
-                (0, 0),
-                (maze.width - 1, maze.height - 1),
-                animate=animate,
-                animation_filename=solutions_animation_dir + name + "/Dijkstra" +
-                (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_animation_filetype
-            )
-            , solutions_dir + name + "/Dijkstra" +
-            (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_filetype
-        )
-        print(f"{name} maze solve with Dijkstra done")
+    # (enabled, description, file name, solver class, extra solver arguments)
+    solvers = [
+        (random_mouse_solver, "Random mouse", "Random_Mouse", RandomMouseSolver, {}),
+        (right_hand_rule_solver, "right hand rule", "Right_Hand_rule", RightHandRuleSolver, {}),
+        (left_hand_rule_solver, "left hand rule", "Left_Hand_rule", LeftHandRuleSolver, {}),
+        (dfs_solver, "DFS", "DFS", DFSSolver, {}),
+        (bfs_solver, "BFS", "BFS", BFSSolver, {}),
+        (bidirectional_bfs_solver, "bidirectional BFS", "Bidirectional_BFS", BidirectionalBFSSolver, {}),
+        (dijkstra_solver, "Dijkstra", "Dijkstra", DijkstraSolver, {}),
+        (a_star_solver_manhattan, "A* (manhattan)", "A_Star_manhattan", AStarSolver, {'manhattan': True}),
+        (a_star_solver_euclidean, "A* (Euclidean)", "A_Star_Euclidean", AStarSolver, {'manhattan': False}),
+        (bidirectional_a_star_solver_manhattan, "bidirectional A* (manhattan)", "Bidirectional_A_Star_manhattan",
+         BidirectionalAStarSolver, {'manhattan': True}),
+        # The Euclidean heuristic (without square root) overestimates, so this variant can return longer paths than
+        # BFS and it expands more cells than A* (Euclidean), it is only kept for comparison
+        (bidirectional_a_star_solver_euclidean, "bidirectional A* (Euclidean)", "Bidirectional_A_Star_Euclidean",
+         BidirectionalAStarSolver, {'manhattan': False}),
+        (dead_end_filling_solver, "dead end filling", "DeadEndFiller", DeadEndFiller, {}),
+    ]
+    size = f"_{maze.width}x{maze.height}" if add_maze_size_to_name else ""
 
-    if a_star_solver_manhattan:
-        print(f"{name} maze solve with A* (manhattan) start")
-        maze.save_path(
-            AStarSolver(
-                maze,
-                manhattan=True
-            ).solve(
-                (0, 0),
-                (maze.width - 1, maze.height - 1),
-                animate=animate,
-                animation_filename=solutions_animation_dir + name + "/A_Star_manhattan" +
-                (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_animation_filetype
-            )
-            , solutions_dir + name + "/A_Star_manhattan" +
-            (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_filetype
+    def solve(description, filename, solver_class, arguments):
+        print(f"{name} maze solve with {description} start")
+        solver = solver_class(maze, **arguments)
+        solver.solve(
+            (0, 0),
+            (maze.width - 1, maze.height - 1),
+            animate=animate,
+            animation_filename=solutions_animation_dir + name + "/" + filename + size + solutions_animation_filetype
         )
-        print(f"{name} maze solve with A* (manhattan) done")
+        solver.save_path(solutions_dir + name + "/" + filename + size + solutions_filetype)
+        expanded = f" ({solver.expanded} cells expanded)" if solver.expanded else ""
+        print(f"{name} maze solve with {description} done{expanded}")
 
-    if a_star_solver_euclidean:
-        print(f"{name} maze solve with A* (Euclidean) start")
-        maze.save_path(
-            AStarSolver(
-                maze,
-                manhattan=False
-            ).solve(
-                (0, 0),
-                (maze.width - 1, maze.height - 1),
-                animate=animate,
-                animation_filename=solutions_animation_dir + name + "/A_Star_Euclidean" +
-                (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_animation_filetype
-            )
-            , solutions_dir + name + "/A_Star_Euclidean" +
-            (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_filetype
-        )
-        print(f"{name} maze solve with A* (Euclidean) done")
-
-    if dead_end_filling_solver:
-        print(f"{name} maze solve with dead end filling start")
-        maze.save_path(
-            DeadEndFiller(
-                maze
-            ).solve(
-                (0, 0),
-                (maze.width - 1, maze.height - 1),
-                animate=animate,
-                animation_filename=solutions_animation_dir + name + "/DeadEndFiller" +
-                (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_animation_filetype
-            )
-            , solutions_dir + name + "/DeadEndFiller" +
-            (f"_{maze.width}x{maze.height}" if add_maze_size_to_name else "") + solutions_filetype
-        )
-        print(f"{name} maze solve with dead end filling done")
+    with ThreadPoolExecutor(workers or os.cpu_count()) as executor:
+        futures = [executor.submit(solve, *solver[1:]) for solver in solvers if solver[0]]
+        for future in futures:
+            future.result()